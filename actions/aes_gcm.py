@@ -1,60 +1,76 @@
-import base64
-from typing import Tuple
+from binascii import a2b_base64 as _b64d, b2a_base64 as _b64e
+import struct
+from typing import Iterator, List, Optional, Union
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 from actions.gf128 import (
     POLYS,
+    REVERSE_TABLE,
     bytes_to_int_gcm,
     int_to_bytes_gcm,
     carryless_mul,
-    gf_reduce_poly
+    gf_reduce_poly,
+    gf_mul_reduce,
+    gf_shoup_table,
+    gf_shoup_reduction_table,
+    gf_ghash_table
 )
 
 BLOCK_SIZE = 16  # 128 Bit
-
-def aes_ecb_encrypt_block(key_bytes: bytes, block16: bytes) -> bytes:
+NONCE_SIZE = 12  # 96 Bit, der Zähler belegt die restlichen 32 Bit des CTR-Blocks
+# Ab dieser Blockanzahl lohnt sich der Aufbau der Shoup-Tabelle für H in ghash
+SHOUP_MIN_BLOCKS = 16
+# Blöcke je Abschnitt beim verschränkten CTR+GHASH in gcm_encrypt (Vielfaches von 4)
+CTR_CHUNK_BLOCKS = 256
+# CTR-Block: 96-Bit-Nonce gefolgt vom 32-Bit-Zähler (Big-Endian)
+_CTR_BLOCK = struct.Struct(">12sI")
+
+def check_nonce(nonce_prefix: bytes):
     """
-    Verschlüsselt einen einzelnen 16-Byte-Block mit AES-128 im ECB-Modus.
-    Rückgabe: 16 Bytes Ciphertext.
+    Stellt sicher, dass die Nonce genau 96 Bit lang ist; das 12s-Format des
+    CTR-Structs würde sie sonst stillschweigend kürzen oder mit Nullen auffüllen.
     """
-    cipher = Cipher(algorithms.AES(key_bytes), modes.ECB())
-    encryptor = cipher.encryptor()
-    return encryptor.update(block16) + encryptor.finalize()
+    if len(nonce_prefix) != NONCE_SIZE:
+        raise ValueError(f"Nonce must be {NONCE_SIZE} bytes, got {len(nonce_prefix)}")
 
-def inc32(counter_block: bytes) -> bytes:
+def ctr_block(nonce_prefix: bytes, counter: int) -> bytes:
     """
-    Erhöht den 32-Bit-Zähler eines 16-Byte-CTR-Blocks im Big-Endian-Format um 1.
-    Layout: erste 12 Bytes = Nonce (Prefix), letzte 4 Bytes = Zähler
-    Rückgabe: neuer 16-Byte-Block mit demselben Nonce und inkrementiertem Zähler.
+    Erzeugt den einzelnen CTR-Block Nonce || Zähler.
     """
-    nonce_prefix = counter_block[:12]  # feste 96-Bit Nonce (12 Bytes)
-    counter_bytes = counter_block[12:]  # 32-Bit Zähler (4 Bytes)
-    counter_value = int.from_bytes(counter_bytes, byteorder="big")
-
-    new_counter_value = (counter_value + 1) & 0xFFFFFFFF
-    new_counter_bytes = new_counter_value.to_bytes(4, byteorder="big")
+    check_nonce(nonce_prefix)
+    return _CTR_BLOCK.pack(nonce_prefix, counter & 0xFFFFFFFF)
 
-    return nonce_prefix + new_counter_bytes
+def ctr_blocks(nonce_prefix: bytes, start: int, count: int) -> bytes:
+    """
+    Erzeugt count aufeinanderfolgende CTR-Blöcke Nonce || Zähler ab Zählerwert start.
+    Der 32-Bit-Zähler läuft wie inc32 in GCM modulo 2^32 über; Nonce und Zähler
+    werden über einen vorkompilierten Struct in einem Schritt gepackt.
+    Rückgabe: alle Blöcke als zusammenhängende Bytefolge (count * 16 Bytes).
+    """
+    check_nonce(nonce_prefix)
+    pack = _CTR_BLOCK.pack
+    return b"".join([pack(nonce_prefix, i & 0xFFFFFFFF) for i in range(start, start + count)])
 
-def split_blocks(b: bytes) -> Tuple[list, int]:
+def iter_blocks(b: bytes) -> Iterator[Union[memoryview, bytes]]:
     """
-    Teilt eine Bytefolge in 16-Byte-Blöcke auf.
-    Rückgabe: (Liste der Blöcke, Gesamtlänge der Eingabe).
+    Liefert die 16-Byte-Blöcke einer Bytefolge ohne Kopie als memoryview.
+    Ein unvollständiger letzter Block wird mit Nullbytes (0x00) auf 16 Bytes aufgefüllt.
     """
-    blocks = []
+    view = memoryview(b)
     length = len(b)
-    for i in range(0, length, 16):
-        blocks.append(b[i:i + 16])
-    return blocks, length
+    full = length - length % 16
+    for i in range(0, full, 16):
+        yield view[i:i + 16]
+    if full != length:
+        yield bytes(view[full:]) + bytes(16 - (length - full))
 
-def pad_to_block(b: bytes):
+def iter_block_ints_gcm(b: bytes) -> Iterator[int]:
     """
-    Paddet eine Bytefolge mit Nullbytes (0x00) auf das nächste Vielfache von 16 Bytes.
-    Wenn bereits auf Blockgröße, bleibt die Eingabe unverändert.
+    Liefert die mit Nullen aufgefüllten 16-Byte-Blöcke direkt in interner Polynomdarstellung.
+    Die Bitspiegelung erfolgt einmal für den ganzen Puffer, jeder Block wird dann als Little-Endian gelesen.
     """
-    if len(b) % 16 == 0:
-        return b
-    return b + bytes(16 - (len(b) % 16))
+    for block in iter_blocks(b.translate(REVERSE_TABLE)):
+        yield int.from_bytes(block, "little")
 
 def gcm_len_block(len_a_int: int, len_c_int: int):
     """
@@ -66,84 +82,112 @@ def xor_bytes(a: bytes, b: bytes) -> bytes:
     """
     Führt ein byteweises XOR zwischen zwei Bytefolgen aus.
     Es werden nur so viele Bytes verarbeitet, wie die kürzere Eingabe lang ist.
+    Das XOR läuft über beide Bytefolgen als je ein großer Integer statt Byte für Byte.
     Rückgabe: neues Bytes-Objekt mit den XOR-Ergebnissen.
     """
-    result_list = []
-    for x, y in zip(a, b):
-        result_list.append(x ^ y)
-    return bytes(result_list)
+    n = min(len(a), len(b))
+    xored = int.from_bytes(a[:n], "big") ^ int.from_bytes(b[:n], "big")
+    return xored.to_bytes(n, "big")
+
+def ghash_update(X_int: int, block_ints: List[int], H_int: int, mod_poly: int, table: Optional[List[int]] = None) -> int:
+    """
+    Führt den GHASH-Akkumulator X über weitere Blöcke (interne Polynomdarstellung) fort.
+    Mit Shoup-Tabelle für H läuft die Multiplikation über den Tabellenkern,
+    sonst aggregiert in Vierergruppen mit nur einer Reduktion je Gruppe.
+    Rückgabe: neuer Akkumulator X.
+    """
+    if table is not None:
+        return gf_ghash_table(X_int, block_ints, table, gf_shoup_reduction_table(mod_poly))
+
+    # volle Vierergruppen aggregiert mit nur einer Reduktion:
+    # X' = (X xor B0)*H^4 + B1*H^3 + B2*H^2 + B3*H
+    full = len(block_ints) - len(block_ints) % 4
+    if full:
+        # Potenzen H^2, H^3, H^4 nur erzeugen, wenn es mindestens eine Vierergruppe gibt
+        H2 = gf_mul_reduce(H_int, H_int, mod_poly)
+        H3 = gf_mul_reduce(H2, H_int, mod_poly)
+        H4 = gf_mul_reduce(H3, H_int, mod_poly)
+        for i in range(0, full, 4):
+            B0, B1, B2, B3 = block_ints[i:i + 4]
+            product = (carryless_mul(X_int ^ B0, H4) ^ carryless_mul(B1, H3)
+                       ^ carryless_mul(B2, H2) ^ carryless_mul(B3, H_int))
+            X_int = gf_reduce_poly(product, mod_poly)
+
+    # Rest (< 4 Blöcke) einzeln: X = (X xor block) * H
+    for block_int in block_ints[full:]:
+        X_int = gf_mul_reduce(X_int ^ block_int, H_int, mod_poly)
+    return X_int
 
 def ghash(H_bytes: bytes, A: bytes, C: bytes, poly: str):
-    # Startwert X_0, hier noch in GCM-Repräsentation (Umwandlung in step())
-    X = bytes(BLOCK_SIZE)
+    # Alle Werte bleiben über die gesamte Schleife in interner Polynomdarstellung,
+    # umgewandelt wird nur beim Einlesen der Blöcke und bei der Ausgabe von X
     mod_poly = POLYS[poly]
+    H_int = bytes_to_int_gcm(H_bytes)
 
-    # GHASH-Schritt X = (X xor block) * H
-    def step(X_bytes: bytes, ad_block_bytes: bytes):
-        # GCM zu interner Polynomdarstellung
-        X_int = bytes_to_int_gcm(X_bytes)
-        A_int = bytes_to_int_gcm(ad_block_bytes)
-        H_int = bytes_to_int_gcm(H_bytes)
-        X_xor_A = X_int ^ A_int
-        product = carryless_mul(X_xor_A, H_int)
-        reduced = gf_reduce_poly(product, mod_poly)
-        # Interne Polynomdarstellung zu GCM-Repräsentation
-        return int_to_bytes_gcm(reduced)
-
-    # A-Blöcke Null-Padding
-    A_blocks, _ = split_blocks(pad_to_block(A))
-    for a in A_blocks:
-        X = step(X, a)
-
-    # C-Blöcke Null-Padding
-    C_blocks, _ = split_blocks(pad_to_block(C))
-    for c in C_blocks:
-        X = step(X, c)
-
-    # Längenblock
+    # A- und C-Blöcke mit Null-Padding, danach der Längenblock
     L = gcm_len_block(len(A)*8, len(C)*8)
-    X = step(X, L)
-    return X, L
+    block_ints = list(iter_block_ints_gcm(A))
+    block_ints.extend(iter_block_ints_gcm(C))
+    block_ints.append(bytes_to_int_gcm(L))
+
+    # lange Eingaben: Multiplikation mit H über die 8-Bit-Shoup-Tabelle
+    table = gf_shoup_table(H_int, mod_poly) if len(block_ints) >= SHOUP_MIN_BLOCKS else None
+    X_int = ghash_update(0, block_ints, H_int, mod_poly, table)
+    return int_to_bytes_gcm(X_int), L
 
 def gcm_encrypt(arguments: dict) -> dict:
     """
     Führt die GCM-Verschlüsselung durch.
     """
     poly = arguments["poly"]
-    key_bytes = base64.b64decode(arguments["key"])
-    nonce_bytes = base64.b64decode(arguments["nonce"])
-    plaintext_bytes = base64.b64decode(arguments["plaintext"])
-    ad_bytes = base64.b64decode(arguments["ad"])
+    key_bytes = _b64d(arguments["key"])
+    nonce_bytes = _b64d(arguments["nonce"])
+    plaintext_bytes = _b64d(arguments["plaintext"])
+    ad_bytes = _b64d(arguments["ad"])
+    check_nonce(nonce_bytes)
+
+    # Ein einziger ECB-Encryptor für alle AES-Aufrufe dieses Schlüssels
+    encryptor = Cipher(algorithms.AES(key_bytes), modes.ECB()).encryptor()
 
     # 1) H = AES_K(0^128) -> Auth key
-    H = aes_ecb_encrypt_block(key_bytes, bytes(BLOCK_SIZE))
+    H = encryptor.update(bytes(BLOCK_SIZE))
 
     # 2) Counter-Blöcke: Y0 = Nonce || 0x00000001 (für Tag-Maskierung)
-    Y0 = nonce_bytes + (1).to_bytes(4, "big")
-    # Y2, Y3, ... für Datenverschlüsselung (Start bei Nonce||0x00000002)
-    ctr = 2
-    Y = nonce_bytes + ctr.to_bytes(4, "big")
-
-    # 3) CTR-Encryption des plaintexts
-    c_chunks = []
-    p_blocks, p_length = split_blocks(plaintext_bytes)
-    for p in p_blocks:
-        keystream = aes_ecb_encrypt_block(key_bytes, Y)
-        c = xor_bytes(p, keystream[:len(p)])  # nur so viele Bytes wie p hat
-        c_chunks.append(c)
-        Y = inc32(Y)  # Zähler Y erhöhen, damit der nächste Block neuen Keystream erhält
-    ciphertext = b"".join(c_chunks)
-
-    # 4) GHASH über (A, C) durchführen
-    S, L_block = ghash(H, ad_bytes, ciphertext, poly)
+    Y0 = ctr_block(nonce_bytes, 1)
+
+    # 3) CTR-Encryption und GHASH verschränkt: jeder Abschnitt des Ciphertexts wird direkt nach
+    #    seiner Erzeugung in den GHASH-Akkumulator eingerechnet, solange er noch im Cache liegt
+    mod_poly = POLYS[poly]
+    H_int = bytes_to_int_gcm(H)
+    n_blocks = (len(plaintext_bytes) + BLOCK_SIZE - 1) // BLOCK_SIZE
+    n_ad_blocks = (len(ad_bytes) + BLOCK_SIZE - 1) // BLOCK_SIZE
+    # lange Eingaben: Multiplikation mit H über die 8-Bit-Shoup-Tabelle
+    table = gf_shoup_table(H_int, mod_poly) if n_ad_blocks + n_blocks + 1 >= SHOUP_MIN_BLOCKS else None
+
+    X_int = ghash_update(0, list(iter_block_ints_gcm(ad_bytes)), H_int, mod_poly, table)
+    chunks = []
+    for first in range(0, n_blocks, CTR_CHUNK_BLOCKS):
+        count = min(CTR_CHUNK_BLOCKS, n_blocks - first)
+        # Zählerblöcke ab Nonce||0x00000002 abschnittsweise in einem Aufruf verschlüsseln
+        keystream = encryptor.update(ctr_blocks(nonce_bytes, 2 + first, count))
+        # nur so viele Bytes wie der plaintext hat
+        chunk = xor_bytes(plaintext_bytes[first * BLOCK_SIZE:(first + count) * BLOCK_SIZE], keystream)
+        chunks.append(chunk)
+        X_int = ghash_update(X_int, list(iter_block_ints_gcm(chunk)), H_int, mod_poly, table)
+    ciphertext = b"".join(chunks)
+
+    # 4) Längenblock als letzter GHASH-Block
+    L_block = gcm_len_block(len(ad_bytes) * 8, len(ciphertext) * 8)
+    X_int = ghash_update(X_int, [bytes_to_int_gcm(L_block)], H_int, mod_poly, table)
+    S = int_to_bytes_gcm(X_int)
 
     # 5) TAG berechnen mit AES(YO) ^ outputGHASH
-    E_Y0 = aes_ecb_encrypt_block(key_bytes, Y0)
+    E_Y0 = encryptor.update(Y0)
     tag = xor_bytes(E_Y0, S)
 
     return {
-        "ciphertext": base64.b64encode(ciphertext).decode("ascii"),
-        "tag": base64.b64encode(tag).decode("ascii"),
-        "L": base64.b64encode(L_block).decode("ascii"),
-        "H": base64.b64encode(H).decode("ascii"),
+        "ciphertext": _b64e(ciphertext, newline=False).decode("ascii"),
+        "tag": _b64e(tag, newline=False).decode("ascii"),
+        "L": _b64e(L_block, newline=False).decode("ascii"),
+        "H": _b64e(H, newline=False).decode("ascii"),
     }
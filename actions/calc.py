@@ -1,3 +1,5 @@
+import operator
+
 def parse_to_int(value, name):
     """
     Konvertiert einen Integer oder String in einen Integer und validiert Eingaben.
@@ -22,6 +24,14 @@ def divide_trunc_toward_zero(a, b):
         return quotient + 1
     return quotient
 
+# Operator -> Rechenfunktion, ein Dictionary-Lookup statt einer if/elif-Kette
+_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": divide_trunc_toward_zero,
+}
+
 def calc(arguments):
     """
     Berechnet lhs op rhs und gibt je nach Größenordnung ein Integer oder eine Hex-Darstellung zurück.
@@ -36,21 +46,15 @@ def calc(arguments):
 
         if op is None:
             raise ValueError ("Missing operator")
-        elif op not in ["+", "-", "*", "/"]:
+        try:
+            operation = _OPS[op]
+        except (KeyError, TypeError):
             raise ValueError (f"Invalid operator {op}")
 
-        result = 0
-        if op == "+":
-            result = lhs + rhs
-        elif op == "-":
-            result = lhs - rhs
-        elif op == "*":
-            result = lhs * rhs
-        elif op == "/":
-            result = divide_trunc_toward_zero(lhs, rhs)
+        result = operation(lhs, rhs)
 
         # Falls die Zahl außerhalb von 32 Bit ist
-        if result not in range(-(2 ** 31), 2 ** 31):
+        if result < -0x80000000 or result >= 0x80000000:
             return {"answer": hex(result)}
         return {"answer": result}
     except Exception as e:
@@ -1,59 +1,61 @@
-import base64
-from typing import List, Tuple
-from actions.gf128 import GF128
+from binascii import a2b_base64 as _b64d, b2a_base64 as _b64e
+from typing import Dict, List, Optional, Tuple
+from actions.gf128 import GF128, POLYS, bytes_to_int_gcm, int_to_bytes_gcm, gf_shoup_table, gf_shoup_reduction_table, gf_ghash_table
 from actions.gfpoly import GFPoly
-from actions.aes_gcm import split_blocks, pad_to_block, gcm_len_block, xor_bytes
+from actions.aes_gcm import iter_block_ints_gcm, gcm_len_block, xor_bytes
 
 BLOCK_SIZE = 16
 
-def poly_from_block(block: bytes, poly: str) -> GFPoly:
-    """
-    Wandelt einen 16-Byte-Block in ein GF(2^128)-Polynom mit einem einzigen Koeffizienten um
-    """
-    return GFPoly([GF128.from_bytes(block, poly)], poly)
-
 def poly_from_const(elem: GF128, poly: str) -> GFPoly:
     """
     Erzeugt ein GF(2^128)-Polynom aus einem konstanten Koeffizienten
     """
     return GFPoly([elem], poly)
 
-def ghash_formal_poly(A: bytes, C: bytes, poly: str) -> GFPoly:
+def ghash_formal_poly(A: bytes, C: bytes) -> List[int]:
     """
-    Konstruiert das formale GHASH-Polynom aus assoziierten Daten und Ciphertext gemäß GCM
+    Konstruiert das formale GHASH-Polynom aus assoziierten Daten und Ciphertext gemäß GCM.
+    Rückgabe: Koeffizientenliste (interne Integer) in aufsteigender Gradordnung. Mit den Blöcken X_1..X_m
+    von A || C || L gilt S(X) = sum X_i * X^(m-i+1), die Koeffizienten sind also die Blöcke in umgekehrter
+    Reihenfolge hinter einem konstanten Glied 0.
     """
-    X_var = GFPoly.X(poly)
-    S = GFPoly.zero(poly)
-
-    for a in split_blocks(pad_to_block(A))[0]:
-        S = (S + poly_from_block(a, poly)) * X_var
-
-    for c in split_blocks(pad_to_block(C))[0]:
-        S = (S + poly_from_block(c, poly)) * X_var
+    blocks = list(iter_block_ints_gcm(A))
+    blocks.extend(iter_block_ints_gcm(C))
+    blocks.append(bytes_to_int_gcm(gcm_len_block(len(A) * 8, len(C) * 8)))
+    blocks.append(0)
+    blocks.reverse()
+    return blocks
 
-    L = gcm_len_block(len(A) * 8, len(C) * 8)
-    S = (S + poly_from_block(L, poly)) * X_var
-    return S
-
-def eval_poly_at(S: GFPoly, H: GF128) -> GF128:
+def eval_poly_at(S: List[int], H: GF128, table: Optional[List[int]] = None) -> int:
     """
-    Berechnet S(H) mittels klassischem Horner-Schema über GF(2^128)
+    Berechnet S(H) mittels klassischem Horner-Schema über GF(2^128).
+    Akkumulator und Ergebnis bleiben rohe Integer, GF128-Objekte entstehen erst an der Ausgabe.
     """
     # Klassisches Horner-schema acc = (...((a_n)*H + a_{n-1})*H + ... )*H + a_0
-    acc = GF128(0, H.poly)
-    coeffs = S.as_list()
-    for i in range(len(coeffs) - 1, -1, -1):
-        if acc.value != 0:
-            acc = acc * H
-        acc = GF128(acc.value ^ coeffs[i].value, acc.poly)
-    return acc
+    # Jeder Schritt multipliziert mit demselben H, daher über die Shoup-Tabelle von H
+    mod_poly = POLYS[H.poly]
+    if table is None:
+        table = gf_shoup_table(H.value, mod_poly)
+    acc = gf_ghash_table(0, S[:0:-1], table, gf_shoup_reduction_table(mod_poly))
+    return acc ^ S[0]
+
+def eval_all(polys: List[List[int]], H: GF128, table_cache: Dict[int, List[int]]) -> List[int]:
+    """
+    Wertet mehrere Polynome an derselben Stelle H aus, die Shoup-Tabelle für H wird pro H nur einmal erzeugt
+    """
+    table = table_cache.get(H.value)
+    if table is None:
+        table = gf_shoup_table(H.value, POLYS[H.poly])
+        table_cache[H.value] = table
+    return [eval_poly_at(S, H, table) for S in polys]
 
-def build_F(S1: GFPoly, tag1: bytes, S2: GFPoly, tag2: bytes, poly: str) -> GFPoly:
+def build_F(S1: List[int], tag1: bytes, S2: List[int], tag2: bytes, poly: str) -> GFPoly:
     """
     Erzeugt das Polynom F = (S1 + S2 + (T1 xor T2)) und macht es monisch
     """
-    const = GF128.from_bytes(xor_bytes(tag1, tag2), poly)
-    return (S1 + S2 + poly_from_const(const, poly)).monic()
+    const = poly_from_const(GF128.from_bytes(xor_bytes(tag1, tag2), poly), poly)
+    # die Koeffizientenlisten sind bereits rohe Feldelemente und werden direkt übernommen
+    return (GFPoly._from_raw(S1, const.poly) + GFPoly._from_raw(S2, const.poly) + const).monic()
 
 def extract_linear_roots(factor: GFPoly) -> List[GF128]:
     """
@@ -89,18 +91,18 @@ def gcm_crack(arguments: dict) -> dict:
         """
         Parst eine Nachricht und gibt (A, C, T) als Bytes zurück
         """
-        A = base64.b64decode(m["associated_data"]) if m.get("associated_data") else b""
-        C = base64.b64decode(m["ciphertext"])
-        T = base64.b64decode(m["tag"])
+        A = _b64d(m["associated_data"]) if m.get("associated_data") else b""
+        C = _b64d(m["ciphertext"])
+        T = _b64d(m["tag"])
         return A, C, T
 
     A1, C1, T1 = parse_msg(arguments["m1"])
     A2, C2, T2 = parse_msg(arguments["m2"])
     A3, C3, T3 = parse_msg(arguments["m3"])
 
-    S1_poly = ghash_formal_poly(A1, C1, poly)
-    S2_poly = ghash_formal_poly(A2, C2, poly)
-    S3_poly = ghash_formal_poly(A3, C3, poly)
+    S1_poly = ghash_formal_poly(A1, C1)
+    S2_poly = ghash_formal_poly(A2, C2)
+    S3_poly = ghash_formal_poly(A3, C3)
 
     F_1_2 = build_F(S1_poly, T1, S2_poly, T2, poly)
     F_1_3 = build_F(S1_poly, T1, S3_poly, T3, poly)
@@ -117,24 +119,25 @@ def gcm_crack(arguments: dict) -> dict:
 
     H_ok = None
     E0_ok = None
+    table_cache: Dict[int, List[int]] = {}  # Shoup-Tabellen je H-Kandidat
+    T1_int = bytes_to_int_gcm(T1)
+    T3_int = bytes_to_int_gcm(T3)
     for H_candidate in H_candidates:
         # Validiert einen H-Kandidaten mittels Tags und speichert bei Erfolg H und Maske E0
-        S1_val = eval_poly_at(S1_poly, H_candidate)
-        E0_bytes = xor_bytes(T1, S1_val.to_bytes())
-        E0_elem = GF128.from_bytes(E0_bytes, poly)
+        S1_val, S3_val = eval_all([S1_poly, S3_poly], H_candidate, table_cache)
+        E0_int = T1_int ^ S1_val
 
-        S3_val = eval_poly_at(S3_poly, H_candidate)
-        if xor_bytes(E0_bytes, S3_val.to_bytes()) == T3:
+        if E0_int ^ S3_val == T3_int:
             H_ok = H_candidate
-            E0_ok = E0_elem
+            E0_ok = GF128._from_raw(E0_int, H_candidate.poly)
             break
 
     forgery = arguments["forgery"]
-    Cfg = base64.b64decode(forgery["ciphertext"])
-    Afg = base64.b64decode(forgery["associated_data"]) if forgery.get("associated_data") else b""
+    Cfg = _b64d(forgery["ciphertext"])
+    Afg = _b64d(forgery["associated_data"]) if forgery.get("associated_data") else b""
 
-    Sfg_poly = ghash_formal_poly(Afg, Cfg, poly)
-    Sfg_val = eval_poly_at(Sfg_poly, H_ok)
-    tag_forg = xor_bytes(E0_ok.to_bytes(), Sfg_val.to_bytes())
+    Sfg_poly = ghash_formal_poly(Afg, Cfg)
+    Sfg_val, = eval_all([Sfg_poly], H_ok, table_cache)
+    tag_forg = int_to_bytes_gcm(E0_ok.value ^ Sfg_val)
 
-    return {"tag": base64.b64encode(tag_forg).decode("ascii"), "H": H_ok.to_b64(), "mask": E0_ok.to_b64()}
\ No newline at end of file
+    return {"tag": _b64e(tag_forg, newline=False).decode("ascii"), "H": H_ok.to_b64(), "mask": E0_ok.to_b64()}
\ No newline at end of file
@@ -1,5 +1,5 @@
-import base64
-from typing import Dict, Tuple
+from binascii import a2b_base64 as _b64d, b2a_base64 as _b64e
+from typing import Dict, List, Tuple
 
 # =============================================================================
 # Konstanten
@@ -7,6 +7,7 @@ from typing import Dict, Tuple
 P1 = (1 << 128) | (1 << 7) | (1 << 2) | (1 << 1) | 1
 P2 = (1 << 128) | (1 << 98) | (1 << 69) | (1 << 33) | 1
 POLYS: Dict[str, int] = {"p1": P1, "p2": P2}
+MASK_128 = (1 << 128) - 1
 
 # =============================================================================
 # Hilfsfunktionen
@@ -26,35 +27,69 @@ REVERSE_TABLE = bytes(REVERSE_TABLE_LIST)
 def reverse_bits_128(x: int) -> int:
     """
     Kehrt die Bitreihenfolge in einem 128-Bit-Integer blockweise um:
-    - Byte-Reihenfolge wird invertiert
-    - Innerhalb jedes Bytes werden die Bits gespiegelt (mithilfe von REVERSE_TABLE)
+    - Innerhalb jedes Bytes werden die Bits gespiegelt (bytes.translate mit REVERSE_TABLE)
+    - Byte-Reihenfolge wird invertiert (Rückwandlung als Little-Endian)
     Rückgabe ist ein Integer mit vollständig umgekehrter Bitreihenfolge (128 Bit).
     """
-    b = bytearray(x.to_bytes(16, "big"))
-    b.reverse()
-    for i in range(16):
-        b[i] = REVERSE_TABLE[b[i]]
-    return int.from_bytes(b, "big")
+    return int.from_bytes(x.to_bytes(16, "big").translate(REVERSE_TABLE), "little")
 
 def bytes_to_int_gcm(bs: bytes) -> int:
     """
     Konvertiert 16 GCM-Bytes (Big-Endian, bitgespiegelt) in interne Polynomdarstellung.
     """
-    be_val = int.from_bytes(bs, "big")
-    return reverse_bits_128(be_val)
+    if len(bs) == 16:
+        return int.from_bytes(bs.translate(REVERSE_TABLE), "little")
+    return reverse_bits_128(int.from_bytes(bs, "big"))
 
 def int_to_bytes_gcm(x: int) -> bytes:
     """
     Konvertiert interne Polynomdarstellung in 16 GCM-Bytes (Bitspiegelung + Big-Endian).
     """
-    reversed_bits = reverse_bits_128(x)
-    return reversed_bits.to_bytes(16, "big")
+    return x.to_bytes(16, "little").translate(REVERSE_TABLE)
+
+# Übersetzungstabellen für carryless_mul: '0'/'1' -> Byte 0/1 und Byte -> Paritätsziffer '0'/'1'
+SPREAD_TABLE = bytes.maketrans(b"01", b"\x00\x01")
+PARITY_TABLE = bytes(0x30 | (i & 1) for i in range(256))
 
 def carryless_mul(a: int, b: int) -> int:
     """
     Carryless-Multiplikation (Polynomultiplikation über GF(2)) ohne Reduktion.
+    Jedes Bit wird auf ein eigenes Byte gespreizt, sodass eine einzige Integer-Multiplikation
+    alle Teilprodukte bildet; das niederwertigste Bit jedes Bytes ist dann das XOR der Teilprodukte.
     Rückgabe: Produktpolynom als Integer (Grad bis < 256).
     """
+    if a == 0 or b == 0:
+        return 0
+    # pro Byte dürfen sich höchstens 255 Teilprodukte aufsummieren
+    if min(a.bit_length(), b.bit_length()) < 256:
+        a_spread = int.from_bytes(format(a, "b").encode().translate(SPREAD_TABLE), "big")
+        b_spread = int.from_bytes(format(b, "b").encode().translate(SPREAD_TABLE), "big")
+        product = a_spread * b_spread
+        product_bytes = product.to_bytes((product.bit_length() + 7) // 8, "big")
+        return int(product_bytes.translate(PARITY_TABLE), 2)
+    return carryless_mul_bitwise(a, b)
+
+def spread_bits(a: int) -> int:
+    """
+    Spreizt jedes Bit von a auf ein eigenes Byte (Vorstufe von carryless_mul).
+    Für Stapel von Produkten wird jeder Operand so nur einmal statt pro Produkt gespreizt.
+    """
+    return int.from_bytes(format(a, "b").encode().translate(SPREAD_TABLE), "big")
+
+def collect_parity(product: int) -> int:
+    """
+    Liest aus dem Produkt zweier gespreizter Operanden das Carryless-Produkt zurück
+    (niederwertigstes Bit jedes Bytes).
+    """
+    if product == 0:
+        return 0
+    product_bytes = product.to_bytes((product.bit_length() + 7) // 8, "big")
+    return int(product_bytes.translate(PARITY_TABLE), 2)
+
+def carryless_mul_bitwise(a: int, b: int) -> int:
+    """
+    Bitweise Carryless-Multiplikation, Fallback für sehr breite Operanden.
+    """
     result = 0
     while b:
         if b & 1:
@@ -67,13 +102,93 @@ def gf_reduce_poly(product: int, r: int) -> int:
     """
     Reduziert ein Polynom 'product' modulo x^128 + r auf einen Grad < 128.
     r ist der niedergradige Teil.
+    Für P1 und P2 wird per Faltung reduziert, sonst bitweise.
     """
+    if r == P1:
+        return gf_reduce_p1(product)
+    if r == P2:
+        return gf_reduce_p2(product)
     while product.bit_length() > 128:
         highest_bit = product.bit_length() - 1
         shift = highest_bit - 128
         product ^= (1 << highest_bit) | (r << shift)
     return product & ((1 << 128) - 1)
 
+def gf_reduce_p1(product: int) -> int:
+    """
+    Reduziert ein Produkt modulo P1 durch Faltung: x^128 = x^7 + x^2 + x + 1.
+    Der obere Teil hi wird als hi * r auf den unteren Teil gefaltet, bis kein Überlauf bleibt
+    (für Produkte mit Grad < 256 genau zwei Schritte).
+    """
+    lo = product & MASK_128
+    hi = product >> 128
+    while hi:
+        folded = hi ^ (hi << 1) ^ (hi << 2) ^ (hi << 7)  # hi * r
+        hi = folded >> 128
+        lo ^= folded & MASK_128
+    return lo
+
+def gf_reduce_p2(product: int) -> int:
+    """
+    Reduziert ein Produkt modulo P2 durch Faltung: x^128 = x^98 + x^69 + x^33 + 1.
+    Jeder Faltungsschritt verkürzt den Überlauf um 30 Bit (Grad < 256: fünf Schritte).
+    """
+    lo = product & MASK_128
+    hi = product >> 128
+    while hi:
+        folded = hi ^ (hi << 33) ^ (hi << 69) ^ (hi << 98)  # hi * r
+        hi = folded >> 128
+        lo ^= folded & MASK_128
+    return lo
+
+def gf_mul_reduce(a: int, b: int, mod_poly: int) -> int:
+    """
+    Multipliziert zwei Elemente und reduziert direkt modulo mod_poly (fusionierter Pfad).
+    """
+    return gf_reduce_poly(carryless_mul(a, b), mod_poly)
+
+# Reduktionstabellen je Polynom für gf_mul_table: R[v] = v * x^128 mod P
+SHOUP_REDUCTION_TABLES: Dict[int, List[int]] = {}
+
+def gf_shoup_table(h: int, mod_poly: int) -> List[int]:
+    """
+    Erzeugt die 8-Bit-Shoup-Tabelle M[v] = v * h mod P für alle 256 Byte-Polynome v.
+    Jeder Eintrag entsteht aus einem kleineren Eintrag und einem Vielfachen h * x^j per XOR.
+    """
+    singles = [h]
+    for _ in range(7):
+        singles.append(gf_reduce_poly(singles[-1] << 1, mod_poly))
+    table = [0] * 256
+    for v in range(1, 256):
+        low_bit = v & -v
+        table[v] = table[v ^ low_bit] ^ singles[low_bit.bit_length() - 1]
+    return table
+
+def gf_shoup_reduction_table(mod_poly: int) -> List[int]:
+    """
+    Gibt die (gecachte) Tabelle R[v] = v * x^128 mod P zurück, mit der ein um 8 Bit
+    herausgeschobenes Byte zurückgefaltet wird.
+    """
+    table = SHOUP_REDUCTION_TABLES.get(mod_poly)
+    if table is None:
+        table = [gf_reduce_poly(v << 128, mod_poly) for v in range(256)]
+        SHOUP_REDUCTION_TABLES[mod_poly] = table
+    return table
+
+def gf_ghash_table(x: int, blocks: List[int], table: List[int], reduction_table: List[int]) -> int:
+    """
+    GHASH-Kern über alle Blöcke: x = (x xor block) * h mit dem festen h der Shoup-Tabelle.
+    Jedes Produkt wird byteweise vom höchsten Grad an gebildet (Horner mit x^8): 16 Schritte statt 128 Bits.
+    Die gesamte Blockschleife läuft in dieser einen Funktion mit lokalen Namen.
+    """
+    mask = MASK_128
+    for block in blocks:
+        acc = 0
+        for byte in (x ^ block).to_bytes(16, "big"):
+            acc = ((acc << 8) & mask) ^ reduction_table[acc >> 120] ^ table[byte]
+        x = acc
+    return x
+
 def poly_divmod(a: int, b: int) -> Tuple[int, int]:
     """
     Polynomdivision in GF(2)[x]: Berechne (q, r) mit a = q*b + r und deg(r) < deg(b).
@@ -107,19 +222,73 @@ def poly_inv(a: int, mod_poly: int) -> int:
         s, t = t, s ^ carryless_mul(q, t) # s, t = t, s + q*t
     return s & ((1 << 128) - 1)
 
-def gf_square_and_multiply(x: int, base: int, exponent: int, mod_poly: int) -> int:
+def gf_square(a: int, mod_poly: int) -> int:
     """
-    Exponentiation in GF(2^128) mit Square-and-Multiply.
+    Quadriert ein Element in GF(2^128). In GF(2)[x] gilt (sum a_i x^i)^2 = sum a_i x^(2i),
+    die Bits werden also nur auseinandergezogen: die Binärziffern von a als Basis-4-Zahl gelesen.
     """
-    while exponent > 0:
-        if exponent & 1:
-            x = carryless_mul(x, base)
-            x = gf_reduce_poly(x, mod_poly)
-        exponent >>= 1
-        if exponent:
-            base = carryless_mul(base, base)
-            base = gf_reduce_poly(base, mod_poly)
-    return x
+    if a == 0:
+        return 0
+    return gf_reduce_poly(int(format(a, "b"), 4), mod_poly)
+
+# Cache für sqrt(x) = x^(2^127) je Reduktionspolynom
+SQRT_X_CACHE: Dict[int, int] = {}
+
+def gf_square_root(a: int, mod_poly: int) -> int:
+    """
+    Berechnet die Quadratwurzel a^(2^127) ohne Exponentiation.
+    Mit a = E(x^2) + x * O(x^2) (gerade/ungerade Bits) gilt sqrt(a) = E(x) + sqrt(x) * O(x),
+    sqrt(x) wird einmal pro Polynom durch 127 Quadrierungen bestimmt.
+    """
+    sqrt_x = SQRT_X_CACHE.get(mod_poly)
+    if sqrt_x is None:
+        sqrt_x = 2  # x
+        for _ in range(127):
+            sqrt_x = gf_square(sqrt_x, mod_poly)
+        SQRT_X_CACHE[mod_poly] = sqrt_x
+    bits = format(a, "0128b")  # bits[0] ist der Koeffizient von x^127
+    even = int(bits[1::2], 2)  # Koeffizienten von x^126, x^124, ..., x^0
+    odd = int(bits[0::2], 2)   # Koeffizienten von x^127, x^125, ..., x^1
+    return even ^ gf_mul_reduce(sqrt_x, odd, mod_poly)
+
+def gf_square_and_multiply(x: int, base: int, exponent: int, mod_poly: int) -> int:
+    """
+    Exponentiation in GF(2^128): berechnet x * base^exponent mit Square-and-Multiply über Fenster.
+    Der Exponent wird von oben in Fenstern von bis zu 4 Bit abgearbeitet, die mit einem gesetzten
+    Bit enden; pro Fenster genügt dann eine Multiplikation mit einer vorab berechneten ungeraden
+    Potenz base^1, base^3, ..., base^15. Quadriert wird mit gf_square.
+    """
+    if exponent <= 0:
+        return x
+    bits = exponent.bit_length()
+    # Fensterbreite: bei kurzen Exponenten lohnt die Vorberechnung nicht
+    window_bits = 4 if bits >= 32 else 2 if bits >= 8 else 1
+    odd_powers = [base]
+    if window_bits > 1:
+        base_sq = gf_square(base, mod_poly)
+        for _ in range((1 << (window_bits - 1)) - 1):
+            odd_powers.append(gf_mul_reduce(odd_powers[-1], base_sq, mod_poly))
+
+    acc = 1
+    i = bits - 1
+    while i >= 0:
+        if not (exponent >> i) & 1:
+            acc = gf_square(acc, mod_poly)
+            i -= 1
+            continue
+        # längstes Fenster [j, i] mit höchstens window_bits Bits, das bei Bit j auf 1 endet
+        j = max(i - window_bits + 1, 0)
+        while not (exponent >> j) & 1:
+            j += 1
+        window = (exponent >> j) & ((1 << (i - j + 1)) - 1)
+        for _ in range(i - j + 1):
+            acc = gf_square(acc, mod_poly)
+        acc = gf_mul_reduce(acc, odd_powers[window >> 1], mod_poly)
+        i = j - 1
+
+    if x == 1:
+        return acc
+    return gf_mul_reduce(x, acc, mod_poly)
 
 def parse_exponent(exponent: int):
     """
@@ -146,6 +315,17 @@ class GF128:
         self.value = value & ((1 << 128) - 1)
         self.poly = poly_norm
 
+    @staticmethod
+    def _from_raw(value: int, poly: str) -> 'GF128':
+        """
+        Erzeugt ein Element ohne erneute Prüfung, für Rechenergebnisse innerhalb des Feldes.
+        value muss bereits reduziert (< 2^128) und poly bereits normalisiert sein.
+        """
+        elem = object.__new__(GF128)
+        elem.value = value
+        elem.poly = poly
+        return elem
+
     # Umrechnungen
     @staticmethod
     def from_bytes(b: bytes, poly: str) -> 'GF128':
@@ -160,7 +340,7 @@ class GF128:
         """
         Erzeugt ein GF128-Element aus einem Base64-kodierten 16-Byte-Wert.
         """
-        b = base64.b64decode(s)
+        b = _b64d(s)
         return GF128.from_bytes(b, poly)
 
     # Ausgabe
@@ -174,25 +354,18 @@ class GF128:
         """
         Gibt das Element Base64-kodiert (16 Bytes) zurück.
         """
-        return base64.b64encode(self.to_bytes()).decode('ascii')
-
-    def assert_same_poly(self, other: 'GF128'):
-        """
-        Stellt sicher, dass Operationen nur zwischen Elementen mit demselben Reduktionspolynom erfolgen.
-        """
-        if self.poly != other.poly:
-            raise ValueError("Polynomials must match for GF operations.")
+        return _b64e(self.to_bytes(), newline=False).decode('ascii')
 
     # Grundoperationen
+    # Das Reduktionspolynom wird nur beim Erzeugen der Elemente geprüft (Konstruktor, GFPoly),
+    # die Rechenoperationen selbst vergleichen es nicht erneut.
     def mul(self, other: 'GF128') -> 'GF128':
         """
         Multipliziert zwei GF(2^128)-Elemente und reduziert modulo x^128 + POLYS[self.poly].
         Rückgabe: neues GF128-Element.
         """
-        self.assert_same_poly(other)
-        product = carryless_mul(self.value, other.value)
-        reduced = gf_reduce_poly(product, POLYS[self.poly])
-        return GF128(reduced, self.poly)
+        reduced = gf_mul_reduce(self.value, other.value, POLYS[self.poly])
+        return GF128._from_raw(reduced, self.poly)
 
     def inv(self) -> 'GF128':
         """
@@ -200,14 +373,13 @@ class GF128:
         Rückgabe: neues GF128-Element (Inverse).
         """
         inv_val = poly_inv(self.value, POLYS[self.poly])
-        return GF128(inv_val, self.poly)
+        return GF128._from_raw(inv_val, self.poly)
 
     def div(self, other: 'GF128') -> 'GF128':
         """
         Teilt zwei GF(2^128)-Elemente: self / other = self * other^{-1}.
         Rückgabe: neues GF128-Element.
         """
-        self.assert_same_poly(other)
         return self.mul(other.inv())
 
     def pow(self, exponent: int) -> 'GF128':
@@ -218,15 +390,14 @@ class GF128:
         base = gf_reduce_poly(self.value, POLYS[self.poly])
         y_int = 1
         result = gf_square_and_multiply(y_int, base, exponent, POLYS[self.poly])
-        return GF128(result, self.poly)
+        return GF128._from_raw(result, self.poly)
 
     def sqrt(self) -> 'GF128':
         """
-        Berechnet die Quadratwurzel in GF(2^128) als Potenz mit 2^127.
+        Berechnet die Quadratwurzel in GF(2^128), entspricht der Potenz mit 2^127.
         Rückgabe: neues GF128-Element.
         """
-        exponent = 1 << 127
-        return self.pow(exponent)
+        return GF128._from_raw(gf_square_root(self.value, POLYS[self.poly]), self.poly)
 
     def __eq__(self, other: object) -> bool:
         """
@@ -265,13 +436,13 @@ def gf_divmod(arguments: dict) -> dict:
     Führt Polynomdivision auf internen Integers aus und gibt q, r als Base64-GCM zurück (keine Felddivision).
     """
     # GCM zu interner Polynomdarstellung umwandeln
-    a_int = bytes_to_int_gcm(base64.b64decode(arguments["a"]))
-    b_int = bytes_to_int_gcm(base64.b64decode(arguments["b"]))
+    a_int = bytes_to_int_gcm(_b64d(arguments["a"]))
+    b_int = bytes_to_int_gcm(_b64d(arguments["b"]))
     q_int, r_int = poly_divmod(a_int, b_int)
     # Interne Polynomdarstellung in GCM-Repräsentation umwandeln
     q_bytes = int_to_bytes_gcm(q_int)
     r_bytes = int_to_bytes_gcm(r_int)
-    return {"q": base64.b64encode(q_bytes).decode("ascii"), "r": base64.b64encode(r_bytes).decode("ascii")}
+    return {"q": _b64e(q_bytes, newline=False).decode("ascii"), "r": _b64e(r_bytes, newline=False).decode("ascii")}
 
 def gf_inv(arguments: dict) -> dict:
     """
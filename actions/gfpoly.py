@@ -1,36 +1,244 @@
-from typing import List, Iterable, Tuple
+from typing import Callable, List, Iterable, Optional, Tuple
 from actions import gf128
+from actions.gf128 import (
+    POLYS, carryless_mul, spread_bits, collect_parity, gf_reduce_poly, gf_mul_reduce, gf_square, gf_square_root, poly_inv
+)
 import random
 
 GFElement = gf128.GF128  # Alias für bessere Lesbarkeit
+FIELD_SIZE = 1 << 128  # q = Feldgröße von GF(2^128)
 
-def normalize(coeffs: List[GFElement]) -> List[GFElement]:
+def normalize(coeffs: List[int]) -> List[int]:
     """Entfernt führende Nullkoeffizienten und kürzt die Koeffizientenliste entsprechend."""
     i = len(coeffs) - 1
-    while i > 0 and coeffs[i].value == 0:
+    while i > 0 and coeffs[i] == 0:
         i -= 1
     return coeffs[:i + 1]
 
+# Ab dieser Länge beider Faktoren teilt clmul_karatsuba weiter auf, darunter Schulmethode
+KARATSUBA_THRESHOLD = 8
+
+def clmul_schoolbook(A: List[int], B: List[int]) -> List[int]:
+    """
+    Schulmethode für das Produkt zweier Koeffizientenlisten (nicht leer, Koeffizienten < 2^128).
+    Alle Koeffizienten werden vorab einmal gespreizt, jedes Teilprodukt zweier von Null verschiedener
+    Koeffizienten kostet dann nur noch eine Integer-Multiplikation und die Paritätsextraktion.
+    Rückgabe: unreduzierte Koeffizienten (Carryless-Produkte, Grad < 255) in aufsteigender Gradordnung.
+    """
+    # Nullkoeffizienten (z.B. nach diff oder bei dünnen Polynomen) tragen nichts bei und werden übersprungen
+    nonzero_B = [(j, b, spread_bits(b)) for j, b in enumerate(B) if b]
+    out = [0] * (len(A) + len(B) - 1)
+    for i, a in enumerate(A):
+        if a == 0:
+            continue
+        if a == 1:
+            # Multiplikation mit 1: Koeffizienten von B direkt übernehmen
+            for j, b, _ in nonzero_B:
+                out[i + j] ^= b
+            continue
+        a_spread = spread_bits(a)
+        for j, _, b_spread in nonzero_B:
+            out[i + j] ^= collect_parity(a_spread * b_spread)
+    return out
+
+def clmul_karatsuba(A: List[int], B: List[int]) -> List[int]:
+    """
+    Produkt zweier Koeffizientenlisten nach Karatsuba: mit A = A0 + X^m A1, B = B0 + X^m B1 gilt
+    A*B = z0 + X^m (z1 + z0 + z2) + X^2m z2 mit z0 = A0 B0, z2 = A1 B1, z1 = (A0 + A1)(B0 + B1).
+    Additionen sind in Charakteristik 2 reine XORs, daher drei statt vier Teilprodukte.
+    Rückgabe: unreduzierte Koeffizienten wie bei clmul_schoolbook.
+    """
+    len_A, len_B = len(A), len(B)
+    if len_A < KARATSUBA_THRESHOLD or len_B < KARATSUBA_THRESHOLD:
+        return clmul_schoolbook(A, B)
+    if len_A < len_B:
+        A, B, len_A, len_B = B, A, len_B, len_A
+    m = (len_A + 1) // 2
+    out = [0] * (len_A + len_B - 1)
+    A0, A1 = A[:m], A[m:]
+    # B kürzer als die Hälfte von A: nur A teilen
+    if len_B <= m:
+        for k, c in enumerate(clmul_karatsuba(A0, B)):
+            out[k] ^= c
+        for k, c in enumerate(clmul_karatsuba(A1, B)):
+            out[m + k] ^= c
+        return out
+
+    B0, B1 = B[:m], B[m:]
+    z0 = clmul_karatsuba(A0, B0)
+    z2 = clmul_karatsuba(A1, B1)
+    A_sum = list(A0)
+    for i, c in enumerate(A1):
+        A_sum[i] ^= c
+    B_sum = list(B0)
+    for i, c in enumerate(B1):
+        B_sum[i] ^= c
+    z1 = clmul_karatsuba(A_sum, B_sum)
+    for k, c in enumerate(z0):
+        out[k] ^= c
+        z1[k] ^= c
+    for k, c in enumerate(z2):
+        out[2 * m + k] ^= c
+        z1[k] ^= c
+    for k, c in enumerate(z1):
+        out[m + k] ^= c
+    return out
+
+def _mul_coeffs(A: List[int], B: List[int], mod_poly: int) -> List[int]:
+    """
+    Produkt zweier roher Koeffizientenlisten. Die Produkte werden unreduziert je Ausgabegrad
+    aufsummiert und jeder Ausgabekoeffizient erst am Ende einmal reduziert.
+    """
+    return [gf_reduce_poly(c, mod_poly) for c in clmul_karatsuba(A, B)]
+
+def divmod_coeffs(A: List[int], D: List[int], mod_poly: int,
+                  inv_leading_divisor: Optional[int] = None) -> Tuple[List[int], List[int]]:
+    """
+    Polynomdivision auf rohen Koeffizienten (D normalisiert und nicht Null): A = Q*D + R.
+    Der Rest wird in einem einzigen Puffer in place bearbeitet. Die Einträge bleiben dabei
+    unreduziert (XOR-Summen von Carryless-Produkten) und werden erst reduziert, wenn sie als
+    führender Koeffizient gebraucht werden bzw. am Ende für den Rest.
+    inv_leading_divisor kann vom Aufrufer übergeben werden, wenn es schon bekannt ist.
+    Rückgabe: (Q, R) als rohe Koeffizientenlisten.
+    """
+    deg_divisor = len(D) - 1
+    if inv_leading_divisor is None:
+        inv_leading_divisor = poly_inv(D[-1], mod_poly)  # für Monizierung des Divisors
+    monic = inv_leading_divisor == 1
+    R = list(A)
+    Q = [0] * (max(0, len(A) - 1 - deg_divisor) + 1)
+    D_low = D[:-1]  # der führende Term hebt sich jeweils auf
+    # Divisionsalgorithmus: eliminiere die Grade des Restes von oben nach unten
+    for k in range(len(R) - 1, deg_divisor - 1, -1):
+        lead = gf_reduce_poly(R[k], mod_poly)
+        if lead == 0:
+            continue
+        shift_degree = k - deg_divisor
+        # Faktor zum Eliminieren des führenden Terms
+        scale_factor = lead if monic else gf_mul_reduce(lead, inv_leading_divisor, mod_poly)
+        Q[shift_degree] = scale_factor
+        # skalierten und verschobenen Divisor vom Rest abziehen (XOR)
+        for i, coeff_d in enumerate(D_low):
+            R[shift_degree + i] ^= carryless_mul(coeff_d, scale_factor)
+    R = [gf_reduce_poly(c, mod_poly) for c in R[:deg_divisor]]
+    return Q, normalize(R) if R else [0]
+
+def divexact_coeffs(A: List[int], D: List[int], mod_poly: int, inv_leading_divisor: Optional[int] = None) -> List[int]:
+    """
+    Quotient A / D auf rohen Koeffizienten, wenn D ein Teiler von A ist (Rest 0).
+    Wie divmod_coeffs, aktualisiert aber nur die Restkoeffizienten ab Grad deg(D),
+    die später noch führend werden; der untere Teil würde ohnehin zu 0.
+    Rückgabe: Q als rohe Koeffizientenliste.
+    """
+    deg_divisor = len(D) - 1
+    if inv_leading_divisor is None:
+        inv_leading_divisor = poly_inv(D[-1], mod_poly)
+    monic = inv_leading_divisor == 1
+    R = list(A)
+    Q = [0] * (max(0, len(A) - 1 - deg_divisor) + 1)
+    for k in range(len(R) - 1, deg_divisor - 1, -1):
+        lead = gf_reduce_poly(R[k], mod_poly)
+        if lead == 0:
+            continue
+        shift_degree = k - deg_divisor
+        scale_factor = lead if monic else gf_mul_reduce(lead, inv_leading_divisor, mod_poly)
+        Q[shift_degree] = scale_factor
+        # nur Grade >= deg_divisor, also Divisorkoeffizienten ab Index deg_divisor - shift_degree
+        for i in range(max(0, deg_divisor - shift_degree), deg_divisor):
+            R[shift_degree + i] ^= carryless_mul(D[i], scale_factor)
+    return Q
+
+def square_coeffs(A: List[int], mod_poly: int) -> List[int]:
+    """
+    Quadrat einer rohen Koeffizientenliste. In Charakteristik 2 fallen alle gemischten Terme weg:
+    (sum a_i X^i)^2 = sum a_i^2 X^(2i), es genügen also len(A) Quadrierungen im Körper.
+    """
+    out = [0] * (2 * len(A) - 1)
+    out[::2] = [gf_square(c, mod_poly) for c in A]
+    return out
+
+def pow_coeffs(base: List[int], exponent: int, mod_poly: int,
+               reduce: Optional[Callable[[List[int]], List[int]]]) -> List[int]:
+    """
+    Berechnet base^exponent (exponent >= 1) auf rohen Koeffizienten mit Square-and-Multiply über Fenster,
+    wie gf_square_and_multiply für Körperelemente: der Exponent wird von oben in Fenstern von bis zu 4 Bit
+    abgearbeitet, die mit einem gesetzten Bit enden, pro Fenster genügt eine Multiplikation mit einer
+    vorab berechneten ungeraden Potenz base^1, base^3, ..., base^15.
+    reduce wird nach jeder Quadrierung/Multiplikation angewandt (z.B. Barrett modulo M), None = keine Reduktion.
+    """
+    if reduce is None:
+        def reduce(T: List[int]) -> List[int]:
+            return T
+    bits = exponent.bit_length()
+    # Fensterbreite: bei kurzen Exponenten lohnt die Vorberechnung nicht
+    window_bits = 4 if bits >= 32 else 2 if bits >= 8 else 1
+    if exponent & (exponent - 1) == 0:
+        # Zweierpotenz (z.B. q = 2^128 in DDF): nur Quadrierungen, ungerade Potenzen wären umsonst
+        window_bits = 1
+    odd_powers = [base]
+    if window_bits > 1:
+        base_sq = reduce(square_coeffs(base, mod_poly))
+        for _ in range((1 << (window_bits - 1)) - 1):
+            odd_powers.append(reduce(_mul_coeffs(odd_powers[-1], base_sq, mod_poly)))
+
+    acc = None  # None steht für 1, spart die ersten Quadrierungen von 1
+    i = bits - 1
+    while i >= 0:
+        if not (exponent >> i) & 1:
+            acc = reduce(square_coeffs(acc, mod_poly))
+            i -= 1
+            continue
+        # längstes Fenster [j, i] mit höchstens window_bits Bits, das bei Bit j auf 1 endet
+        j = max(i - window_bits + 1, 0)
+        while not (exponent >> j) & 1:
+            j += 1
+        window = (exponent >> j) & ((1 << (i - j + 1)) - 1)
+        if acc is None:
+            acc = odd_powers[window >> 1]
+        else:
+            for _ in range(i - j + 1):
+                acc = reduce(square_coeffs(acc, mod_poly))
+            acc = reduce(_mul_coeffs(acc, odd_powers[window >> 1], mod_poly))
+        i = j - 1
+    return acc
+
 class GFPoly:
-    """Polynom über GF(2^128) mit Koeffizientenliste in aufsteigender Gradordnung (konstantes Glied zuerst)."""
-    __slots__ = ('coeffs', 'poly')
+    """
+    Polynom über GF(2^128) mit Koeffizientenliste in aufsteigender Gradordnung (konstantes Glied zuerst).
+    Die Koeffizienten liegen als rohe Integer in interner Polynomdarstellung vor, GF128-Objekte
+    entstehen nur an den Schnittstellen (Konstruktor, as_list, leading_coeff, Base64).
+    """
+    # _barrett: lazy Barrett-Kontext, wenn Modulus; _inv_lc: lazy Inverses des führenden Koeffizienten
+    __slots__ = ('coeffs', 'poly', '_barrett', '_inv_lc')
 
     def __init__(self, coeffs: Iterable[GFElement], poly: str):
         """Initialisiert ein Polynom mit Koeffizienten im selben Feld (p1/p2) und normalisiert führende Nullen."""
         coeffs = list(coeffs)
-        # leere Liste als 0-Polynom interpretieren
-        if len(coeffs) == 0:
-            coeffs = [GFElement(0, poly)]
-
         poly_norm = str(poly).strip().lower()
-        if poly_norm not in gf128.POLYS:
+        if poly_norm not in POLYS:
             raise ValueError(f'poly must be p1 or p2, got {poly}')
         # alle Koeffizienten müssen in demselben Körper sein
         for c in coeffs:
             if c.poly != poly_norm:
                 raise ValueError("All coefficients must use the same reduction polynomial")
         self.poly = poly_norm
-        self.coeffs = normalize(coeffs)  # führende Nullen entfernen
+        # leere Liste als 0-Polynom interpretieren, führende Nullen entfernen
+        self.coeffs = normalize([c.value for c in coeffs]) if coeffs else [0]
+        self._barrett = None
+        self._inv_lc = None
+
+    @staticmethod
+    def _from_raw(coeffs: List[int], poly: str) -> 'GFPoly':
+        """
+        Erzeugt ein Polynom direkt aus rohen Koeffizienten ohne erneute Prüfung, für Rechenergebnisse.
+        Die Werte müssen bereits reduziert (< 2^128) und poly bereits normalisiert sein.
+        """
+        P = object.__new__(GFPoly)
+        P.coeffs = normalize(coeffs) if coeffs else [0]
+        P.poly = poly
+        P._barrett = None
+        P._inv_lc = None
+        return P
 
     @classmethod
     def from_b64(cls, arr: Iterable[str], poly: str) -> 'GFPoly':
@@ -60,23 +268,33 @@ class GFPoly:
 
     def is_zero(self) -> bool:
         """Prüft, ob das Polynom das Nullpolynom ist."""
-        return len(self.coeffs) == 1 and self.coeffs[0].value == 0
+        # normalisiert ist der führende Koeffizient nur beim Nullpolynom 0
+        return self.coeffs[-1] == 0
 
     def is_one(self) -> bool:
         """Prüft, ob das Polynom das Einspolynom ist."""
-        return len(self.coeffs) == 1 and self.coeffs[0].value == 1
+        return len(self.coeffs) == 1 and self.coeffs[0] == 1
 
     def leading_coeff(self) -> GFElement:
         """Gibt den führenden Koeffizienten (höchster Grad) zurück."""
-        return self.coeffs[-1]
+        return GFElement._from_raw(self.coeffs[-1], self.poly)
 
     def to_b64(self) -> List[str]:
         """Serialisiert die Koeffizientenliste Base64-kodiert."""
-        return [c.to_b64() for c in self.coeffs]
+        return [GFElement._from_raw(c, self.poly).to_b64() for c in self.coeffs]
 
     def as_list(self) -> List[GFElement]:
-        """Gibt eine Kopie der Koeffizientenliste zurück."""
-        return list(self.coeffs)
+        """Gibt die Koeffizienten als Liste von GF128-Elementen zurück."""
+        return [GFElement._from_raw(c, self.poly) for c in self.coeffs]
+
+    def _inv_leading_coeff(self) -> int:
+        """
+        Inverses des führenden Koeffizienten (roh), einmal berechnet und am Polynom gespeichert,
+        da derselbe Divisor in SFF/DDF/EDF wiederholt verwendet wird.
+        """
+        if self._inv_lc is None:
+            self._inv_lc = poly_inv(self.coeffs[-1], POLYS[self.poly])
+        return self._inv_lc
 
     def _assert_same_poly(self, other: 'GFPoly'):
         """Stellt sicher, dass beide Polynome im selben Feld (poly) liegen."""
@@ -87,12 +305,13 @@ class GFPoly:
         """Skaliert das Polynom so, dass der führende Koeffizient 1 ist, Nullpolynom bleibt Null."""
         if self.is_zero():
             return GFPoly.zero(self.poly)
-        lead_coeff = self.leading_coeff()
+        lead_coeff = self.coeffs[-1]
         # wenn führender Koeffizient bereits 1 ist, keine Skalierung nötig
-        if lead_coeff.value == 1:
+        if lead_coeff == 1:
             return self
-        inv_lead_coeff = lead_coeff.inv()  # Inverses im Körper berechnen
-        return GFPoly([c * inv_lead_coeff for c in self.coeffs], self.poly)
+        mod_poly = POLYS[self.poly]
+        inv_lead_coeff = self._inv_leading_coeff()  # Inverses im Körper berechnen
+        return GFPoly._from_raw([gf_mul_reduce(c, inv_lead_coeff, mod_poly) for c in self.coeffs], self.poly)
 
     def __eq__(self, other: object) -> bool:
         """Vergleicht auf Gleichheit von Feld und Koeffizientenliste."""
@@ -106,16 +325,12 @@ class GFPoly:
         # zuerst nach Grad vergleichen
         if deg_A != deg_B:
             return deg_A < deg_B
-        # bei gleichem Grad die Koeffizienten von oben nach unten vergleichen
-        for i in range(deg_A, -1, -1):
-            a = self.coeffs[i].value
-            b = other.coeffs[i].value
-            if a != b:
-                return a < b
-        return False
+        # bei gleichem Grad die Koeffizienten von oben nach unten vergleichen:
+        # lexikographischer Listenvergleich der umgedrehten Koeffizientenlisten (in C)
+        return self.coeffs[::-1] < other.coeffs[::-1]
 
     # =============================================================================
-    # Polynom-Arithmetik
+    # Polynom-Arithmetik (auf rohen Integer-Koeffizienten)
 
     def mod(self, other: 'GFPoly') -> 'GFPoly':
         """Gibt den Rest der Polynomdivision self div other zurück."""
@@ -125,13 +340,13 @@ class GFPoly:
     def add(self, other: 'GFPoly') -> 'GFPoly':
         """Addiert zwei Polynome Koeffizient-weise in GF(2^128)."""
         self._assert_same_poly(other)
-        n = max(len(self.coeffs), len(other.coeffs))
-        out = []
-        for i in range(n):
-            a = self.coeffs[i] if i < len(self.coeffs) else GFElement(0, self.poly)
-            b = other.coeffs[i] if i < len(other.coeffs) else GFElement(0, self.poly)
-            out.append(GFElement(a.value ^ b.value, self.poly))
-        return GFPoly(out, self.poly)
+        A, B = self.coeffs, other.coeffs
+        if len(A) < len(B):
+            A, B = B, A
+        out = list(A)
+        for i, b in enumerate(B):
+            out[i] ^= b
+        return GFPoly._from_raw(out, self.poly)
 
     def sub(self, other: 'GFPoly') -> 'GFPoly':
         """Subtrahiert zwei Polynome, identisch zur Addition in GF(2^128)."""
@@ -140,76 +355,49 @@ class GFPoly:
     def mul(self, other: 'GFPoly') -> 'GFPoly':
         """Multipliziert zwei Polynome und gibt das Ergebnis zurück."""
         self._assert_same_poly(other)
-        deg_A = self.deg()
-        deg_B = other.deg()
-
-        out = [GFElement(0, self.poly) for _ in range(deg_A + deg_B + 1)]
-
-        for i, ai in enumerate(self.coeffs):
-            for j, bj in enumerate(other.coeffs):
-                product = ai * bj
-                out_ij = out[i+j].value ^ product.value
-                out[i+j] = GFElement(out_ij, self.poly)
-        return GFPoly(out, self.poly)
+        return GFPoly._from_raw(_mul_coeffs(self.coeffs, other.coeffs, POLYS[self.poly]), self.poly)
 
     def divmod(self, other: 'GFPoly') -> Tuple['GFPoly', 'GFPoly']:
         """Berechnet Quotient und Rest der Polynomdivision self durch other."""
         self._assert_same_poly(other)
-        quotient_length = max(0, self.deg() - other.deg()) + 1
-        deg_divisor = other.deg()
-        inv_leading_divisor = other.leading_coeff().inv()  # für Monizierung des Divisors
-
-        Q = [GFElement(0, self.poly) for _ in range(quotient_length)]
-        R = normalize(self.as_list())  # aktueller Rest
-        # Divisionsalgorithmus: führe den führenden Term des Restes gegen den des Divisors aus
-        while (len(R) - 1) >= deg_divisor and any(c.value != 0 for c in R):
-            shift_degree = (len(R) - 1) - deg_divisor
-            scale_factor = R[-1] * inv_leading_divisor  # Faktor zum Eliminieren des führenden Terms
-            Q[shift_degree] = GFElement(Q[shift_degree].value ^ scale_factor.value, self.poly)
-            # skalierten Divisor entsprechend Gradverschiebung ausrichten
-            scaled_shifted_divisor = [GFElement(0, self.poly) for _ in range(shift_degree)]
-            for coeff_b in other.coeffs:
-                scaled_shifted_divisor.append(coeff_b * scale_factor)
-            # neuen Rest via XOR bilden
-            max_len = max(len(R), len(scaled_shifted_divisor))
-            new_remainder = []
-            for i in range(max_len):
-                coeff_r = R[i] if i < len(R) else GFElement(0, self.poly)
-                coeff_t = scaled_shifted_divisor[i] if i < len(scaled_shifted_divisor) else GFElement(0, self.poly)
-                new_remainder.append(GFElement(coeff_r.value ^ coeff_t.value, self.poly))
-            R = normalize(new_remainder)  # führende Nullen nach Subtraktion entfernen
-        return GFPoly(Q, self.poly), GFPoly(R, self.poly)
+        mod_poly = POLYS[self.poly]
+        Q, R = divmod_coeffs(self.coeffs, other.coeffs, mod_poly, other._inv_leading_coeff())
+        return GFPoly._from_raw(Q, self.poly), GFPoly._from_raw(R, self.poly)
+
+    def divexact(self, other: 'GFPoly') -> 'GFPoly':
+        """Dividiert durch einen bekannten Teiler other, ohne den (verschwindenden) Rest zu bilden."""
+        self._assert_same_poly(other)
+        Q = divexact_coeffs(self.coeffs, other.coeffs, POLYS[self.poly], other._inv_leading_coeff())
+        return GFPoly._from_raw(Q, self.poly)
 
     def gcd(self, other: 'GFPoly') -> 'GFPoly':
         """Berechnet den größten gemeinsamen Teiler mittels wiederholter Division und Monizierung."""
         self._assert_same_poly(other)
-        A = self
-        B = other
-        # Euklidischer Algorithmus
-        while any(coeff.value != 0 for coeff in B.coeffs):
-            Q, R = A.divmod(B)
+        mod_poly = POLYS[self.poly]
+        A = self.coeffs
+        B = other.coeffs
+        # Euklidischer Algorithmus direkt auf den normalisierten Koeffizientenlisten,
+        # B ist genau dann Null, wenn sein führender Koeffizient 0 ist
+        while B[-1] != 0:
+            _, R = divmod_coeffs(A, B, mod_poly)
             A, B = B, R
         # Ergebnis als monisches Polynom zurückgeben (falls nicht Null)
-        return GFPoly.zero(self.poly) if A.is_zero() else A.monic()
+        return GFPoly._from_raw(A, self.poly).monic()
 
     def pow(self, e: int) -> 'GFPoly':
-        """Potenziert das Polynom mit Exponent e via Square-and-Multiply."""
-        Z = GFPoly.one(self.poly)   # Akkumulator
-        base = GFPoly(self.coeffs, self.poly)
+        """Potenziert das Polynom mit Exponent e via Square-and-Multiply über Fenster."""
         exponent = int(e)
-        # Binäre Exponentiation
-        while exponent > 0:
-            if (exponent & 1) != 0:
-                Z *= base
-            exponent >>= 1
-            if exponent != 0:
-                base *= base
-        return Z
+        if exponent <= 0:
+            return GFPoly.one(self.poly)
+        Z = pow_coeffs(self.coeffs, exponent, POLYS[self.poly], None)
+        return GFPoly._from_raw(Z, self.poly)
 
     def powmod(self, e: int, M: 'GFPoly') -> 'GFPoly':
-        """Berechnet self^e modulo M via Square-and-Multiply mit Zwischenreduktionen."""
+        """
+        Berechnet self^e modulo M via Square-and-Multiply über Fenster.
+        Die Zwischenreduktionen laufen über Barrett mit einmalig vorberechnetem mu.
+        """
         self._assert_same_poly(M)
-        Z = GFPoly.one(self.poly)
         # Sonderfälle
         if M.is_one():
             return GFPoly.zero(self.poly)  # f^e mod 1 = 0
@@ -219,37 +407,70 @@ class GFPoly:
         if self.is_zero():
             return GFPoly.zero(self.poly)  # 0^e mod M = 0 für e > 0
         base = self % M  # initiale Reduktion
-        # Binäre Exponentiation mit Modulo nach jedem Schritt
-        while exponent > 0:
-            if (exponent & 1) != 0:
-                Z = (Z*base) % M
-            exponent >>= 1
-            if exponent != 0:
-                base = (base*base) % M
-        return Z
+        if exponent < 0:
+            return GFPoly.one(self.poly)  # negative Exponenten: leeres Produkt
+        if M.deg() == 0:
+            return base  # Rest modulo einer Konstanten ist immer 0
+
+        barrett = M._barrett_precompute()
+        Z = pow_coeffs(base.coeffs, exponent, POLYS[self.poly], lambda T: M._barrett_reduce(T, barrett))
+        return GFPoly._from_raw(Z, self.poly)
+
+    def _barrett_precompute(self) -> Tuple[List[int], List[int]]:
+        """
+        Barrett-Konstante für Reduktionen modulo self (Grad n >= 1): mu = X^(2n) div self.
+        Rückgabe: Koeffizienten von mu und self, beide bereits gespreizt (spread_bits),
+        da sie in jeder Reduktion wieder als Faktor auftreten. Der Kontext wird am Polynom
+        zwischengespeichert, wiederholte powmod-Aufrufe mit demselben Modulus (EDF) teilen ihn.
+        """
+        if self._barrett is None:
+            n = self.deg()
+            X_2n = GFPoly._from_raw([0] * (2 * n) + [1], self.poly)
+            mu, _ = X_2n.divmod(self)
+            self._barrett = ([spread_bits(c) for c in mu.coeffs], [spread_bits(c) for c in self.coeffs])
+        return self._barrett
+
+    def _barrett_reduce(self, T: List[int], barrett: Tuple[List[int], List[int]]) -> List[int]:
+        """
+        Reduziert rohe Koeffizienten T mit deg(T) < 2n modulo self (Grad n) nach Barrett:
+        q = ((T div X^n) * mu) div X^n, r = T - q*self. Über Polynomen ist q exakt,
+        eine Korrektur wie bei Integern entfällt. Rückgabe: Rest als rohe Koeffizienten.
+        """
+        mu_spread, M_spread = barrett
+        n = len(M_spread) - 1
+        if len(T) <= n:
+            return T
+        mod_poly = POLYS[self.poly]
+        # von (T div X^n) * mu werden nur die Koeffizienten ab Grad n gebraucht ...
+        T_hi = T[n:]
+        q = [0] * len(T_hi)
+        for i, t in enumerate(T_hi):
+            t_spread = spread_bits(t)
+            for j in range(n - i, len(mu_spread)):
+                q[i + j - n] ^= collect_parity(t_spread * mu_spread[j])
+        q = [gf_reduce_poly(c, mod_poly) for c in q]
+        # ... und von q*M nur die unteren n, der Rest hebt sich gegen T auf
+        qM = [0] * n
+        for i, qi in enumerate(q):
+            q_spread = spread_bits(qi)
+            for j in range(n - i):
+                qM[i + j] ^= collect_parity(q_spread * M_spread[j])
+        return normalize([t ^ gf_reduce_poly(c, mod_poly) for t, c in zip(T, qM)])
 
     def diff(self) -> 'GFPoly':
         """Berechnet die Ableitung in GF(2), wobei nur ungerade Grade erhalten bleiben."""
         if len(self.coeffs) <= 1:
             return GFPoly.zero(self.poly)
-        diff = []
-        for i in range(1, len(self.coeffs)):
-            if (i % 2) == 1:
-                diff.append(self.coeffs[i])
-            else:
-                diff.append(GFElement(0, self.poly))
-        return GFPoly(diff, self.poly)
+        diff = self.coeffs[1:]
+        # Koeffizienten gerader Grade i (Position i-1) fallen weg, da i * c = 0 in Charakteristik 2
+        diff[1::2] = [0] * (len(diff) // 2)
+        return GFPoly._from_raw(diff, self.poly)
 
     def sqrt(self) -> 'GFPoly':
         """Berechnet die Quadratwurzel, indem nur Koeffizienten gerader Grade berücksichtigt werden."""
-        max_i = (len(self.coeffs) - 1) // 2
-        sqrt = []
-
-        for i in range(max_i + 1):
-            index = 2 * i
-            c = self.coeffs[index] if index < len(self.coeffs) else GFElement(0, self.poly)
-            sqrt.append(c.sqrt())
-        return GFPoly(sqrt, self.poly)
+        mod_poly = POLYS[self.poly]
+        sqrt = [gf_square_root(c, mod_poly) for c in self.coeffs[::2]]
+        return GFPoly._from_raw(sqrt, self.poly)
 
     def square_free_factorization(self) -> List[Tuple['GFPoly', int]]:
         """Führt die Square-Free-Faktorisierung nach Algorithmus durch und gibt (Faktor, Exponent)-Paare zurück."""
@@ -257,7 +478,8 @@ class GFPoly:
         def sff(f: 'GFPoly') -> List[Tuple['GFPoly', int]]:
             df = f.diff()
             c = f.gcd(df)
-            f_div_c, _ = f.divmod(c)
+            # alle Divisionen in sff gehen auf (Teiler aus einem gcd), daher divexact ohne Rest
+            f_div_c = f.divexact(c)
             z = []
             e = 1
             f_current = f_div_c
@@ -265,11 +487,12 @@ class GFPoly:
 
             while not f_current.is_one():
                 y = f_current.gcd(c_current)
+                # y ist Divisor für beide Divisionen, sein inverser Leitkoeffizient wird nur einmal bestimmt
                 if f_current != y:
-                    q, _ = f_current.divmod(y)
+                    q = f_current.divexact(y)
                     z.append((q.monic(), e))
                 f_current = y
-                c_current, _ = c_current.divmod(y)
+                c_current = c_current.divexact(y)
                 e += 1
 
             if not c_current.is_one():
@@ -284,19 +507,25 @@ class GFPoly:
     def distinct_degree_factorization(self) -> List[Tuple['GFPoly', int]]:
         """Zerlegt das Polynom in Faktoren mit paarweise verschiedenen Graden mittels DDF-Verfahren."""
         f = self.monic()
-        q = 2 ** 128  # Feldgröße von GF(2^128)
+        q = FIELD_SIZE
         z = []
         d = 1
-        f_star = GFPoly(f.coeffs, f.poly)
+        f_star = f
         X = GFPoly.X(self.poly)
+        # X^(q^d) mod f_star wird von Runde zu Runde fortgeschrieben: X^(q^(d+1)) = (X^(q^d))^q,
+        # jede Runde kostet so nur eine Potenz mit q statt mit q^d
+        X_q_d = X
 
         while f_star.deg() >= 2 * d:
-            h = X.powmod(q ** d, f_star) - X
+            X_q_d = X_q_d.powmod(q, f_star)
+            h = X_q_d - X
             g = h.gcd(f_star)
             if not g.is_one():
                 z.append((g.monic(), d))
                 f_star, _ = f_star.divmod(g)
                 f_star = f_star.monic()
+                # das neue f_star teilt das alte, der Rest bleibt modulo f_star gültig
+                X_q_d = X_q_d % f_star
             d += 1
 
         if not f_star.is_one():
@@ -312,17 +541,17 @@ class GFPoly:
         n, r = divmod(f.deg(), d)
         if r != 0:
             raise ValueError("deg(f) ist kein Vielfaches von d")
-        q = 2 ** 128
-        exponent = (q ** d - 1) // 3
+        # (q^d - 1) / 3 mit q^d = 2^(128*d) direkt als Shift statt als Potenz
+        exponent = ((1 << (128 * d)) - 1) // 3
         z = [f]
         while len(z) < n:
             # zufälliges h mit Grad 1..deg(f)-1 erzeugen
             deg_h = random.randrange(1, max(2, f.deg()))
-            coeffs = [GFElement(random.getrandbits(128), f.poly) for _ in range(deg_h + 1)]
+            coeffs = [random.getrandbits(128) for _ in range(deg_h + 1)]
             # sicherstellen, dass h nicht das Nullpolynom ist
-            if all(c.value == 0 for c in coeffs):
-                coeffs[0] = GFElement(1, f.poly)
-            h = GFPoly(coeffs, f.poly)
+            if not any(coeffs):
+                coeffs[0] = 1
+            h = GFPoly._from_raw(coeffs, f.poly)
             h_pow_e = h.powmod(exponent, f)
             g = h_pow_e - GFPoly.one(f.poly)
             snapshot = list(z)
@@ -330,7 +559,7 @@ class GFPoly:
                 if u.deg() > d:
                     j = u.gcd(g)
                     if not j.is_one() and j != u:
-                        q_div, _ = u.divmod(j)
+                        q_div = u.divexact(j)  # j teilt u
                         z.remove(u)
                         j_monic = j.monic()
                         q_monic = q_div.monic()
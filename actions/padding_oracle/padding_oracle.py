@@ -1,6 +1,13 @@
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import actions.padding_oracle.server_connection as sc
 
+# Höchstzahl gleichzeitig angegriffener Blöcke (je eine Verbindung zum Orakel)
+MAX_PARALLEL_BLOCKS = 16
+# Alle Guess-Bytes 0x00..0xFF als ein Integer und 0x01 in jedem der 256 Bytes (für Byte-Broadcast)
+ALL_GUESSES = int.from_bytes(bytes(range(256)), "big")
+BYTE_ONES = int.from_bytes(b"\x01" * 256, "big")
+
 def split_cipher(cipher):
     """
     Teilt einen Byte-Ciphertext in 16-Byte-Blöcke und validiert die Länge
@@ -30,24 +37,22 @@ def single_block_attack(key_id, block, prev_block, connection):
         q_count = 256
 
         # Q-Blöcke generieren
-        q_blocks = []
-        for guess in range(256):
-            q_block_candidate = bytearray(16)
-
-            # Für alle bereits gefundenen Bytes rechts vom aktuellen:
-            # So setzen, dass sie ein gültiges Padding (padding_value) ergeben
-            for j in range(15, current_byte_index, -1):
-                q_block_candidate[j] = (plaintext[j] ^ padding_value) ^ prev_block[j]
-
-            # Aktuelles Byte mit dem Guess so setzen, dass bei korrekter Vermutung das Padding gültig wird
-            q_block_candidate[current_byte_index] = (guess ^ padding_value) ^ prev_block[current_byte_index]
-            q_blocks.append(bytes(q_block_candidate))
-        all_q_blocks = b"".join(q_blocks)
+        # Für alle bereits gefundenen Bytes rechts vom aktuellen:
+        # So setzen, dass sie ein gültiges Padding (padding_value) ergeben.
+        # Dieser Suffix ist für alle 256 Kandidaten gleich und wird nur einmal gebildet
+        suffix = bytes((plaintext[j] ^ padding_value) ^ prev_block[j] for j in range(current_byte_index + 1, 16))
+        template = bytes(current_byte_index + 1) + suffix
+        q_blocks = bytearray(template * q_count)
+
+        # Aktuelles Byte mit dem Guess so setzen, dass bei korrekter Vermutung das Padding gültig wird:
+        # alle 256 Guess-Bytes auf einmal als ein Integer mit der Maske in jedem Byte XORen
+        guess_mask = padding_value ^ prev_block[current_byte_index]
+        q_blocks[current_byte_index::16] = (ALL_GUESSES ^ (guess_mask * BYTE_ONES)).to_bytes(256, "big")
+        all_q_blocks = bytes(q_blocks)
 
         # Server mit 256 Kandidaten in einem Zug abschießen
         try:
-            connection.send_q_count(q_count)
-            connection.send_q_blocks(all_q_blocks)
+            connection.send_batch(q_count, all_q_blocks)
         except Exception as e:
             raise RuntimeError(f"Sending q_blocks or count failed at byte: {current_byte_index}: {e}")
 
@@ -70,33 +75,29 @@ def single_block_attack(key_id, block, prev_block, connection):
         # Prüfung bei mehr als ein gefundener Kandidat
         if len(candidates) > 1:
             selected_candidate = None
-            for candidate in candidates:
-                q_block_candidate = bytearray(16)
-
-                # bekannte Bytes mit aktuellem padding_value
-                for i in range(15, current_byte_index, -1):
-                    q_block_candidate[i] = (plaintext[i] ^ padding_value) ^ prev_block[i]
-
-                # Kandidat für aktuelles Byte
-                q_block_candidate[current_byte_index] = (candidate ^ padding_value) ^ prev_block[current_byte_index]
-
-                # Wähle Flip Bit Index
-                if current_byte_index > 0:
-                    flip_index = current_byte_index - 1
-                else:
-                    flip_index = 1
-                q_block_candidate[flip_index] ^= 0xFF
-
-                # Zur Verifikation nur diesen einen Block senden
-                try:
-                    connection.send_q_count(1)
-                    connection.send_q_blocks(bytes(q_block_candidate))
-                    response = connection.receive_response(1)
-                except Exception as e:
-                    raise RuntimeError(f"Verification step failed at byte {current_byte_index}: {e}")
-
-                # Wenn der Server erneut gültiges Padding meldet, ist dieser Kandidat korrekt
-                if response and response[0] == 1:
+            # Wähle Flip Bit Index
+            if current_byte_index > 0:
+                flip_index = current_byte_index - 1
+            else:
+                flip_index = 1
+
+            # Verifikationsblöcke aus derselben Vorlage (bekannte Bytes mit aktuellem padding_value):
+            # Kandidat für aktuelles Byte einsetzen und ein Byte davor kippen
+            verify_blocks = bytearray(template * len(candidates))
+            for n, candidate in enumerate(candidates):
+                verify_blocks[16 * n + current_byte_index] = (candidate ^ padding_value) ^ prev_block[current_byte_index]
+                verify_blocks[16 * n + flip_index] ^= 0xFF
+
+            # Alle Kandidaten in einer Anfrage verifizieren statt einer Anfrage pro Kandidat
+            try:
+                connection.send_batch(len(candidates), bytes(verify_blocks))
+                response = connection.receive_response(len(candidates))
+            except Exception as e:
+                raise RuntimeError(f"Verification step failed at byte {current_byte_index}: {e}")
+
+            # Wenn der Server erneut gültiges Padding meldet, ist dieser Kandidat korrekt
+            for candidate, r in zip(candidates, response):
+                if r == 1:
                     selected_candidate = candidate
                     break
 
@@ -131,20 +132,29 @@ def start_attack(arguments):
     ciphertext = arguments["ciphertext"]
     ciphertext_blocks = split_cipher(base64.b64decode(ciphertext))
 
-    full_plaintext = []
-    prev_block = iv_bytes
-
-    try:
     # Erster Block ist IV, danach immer vorheriger Cipherblock
-        for block in ciphertext_blocks:
-            connection = sc.Connection(host, port, key_id)
-            connection.connect()
-            plaintext_block = single_block_attack(key_id, block, prev_block, connection)
-            full_plaintext += plaintext_block
-            prev_block = block
+    pairs = list(zip([iv_bytes] + ciphertext_blocks[:-1], ciphertext_blocks))
+
+    def attack_pair(pair):
+        """
+        Greift einen Block über eine eigene Verbindung an (läuft in einem Worker-Thread).
+        """
+        prev_block, block = pair
+        connection = sc.Connection(host, port, key_id)
+        connection.connect()
+        return single_block_attack(key_id, block, prev_block, connection)
+
+    # Die Blöcke sind voneinander unabhängig, da alle Ciphertextblöcke vorab bekannt sind:
+    # parallel angreifen, die Wartezeit auf das Orakel überlappt sich (I/O-gebunden)
+    try:
+        if not pairs:
+            plaintext_blocks = []
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(pairs), MAX_PARALLEL_BLOCKS)) as executor:
+                plaintext_blocks = list(executor.map(attack_pair, pairs))
     except Exception as e:
         return {"error": str(e)}
 
-    result_bytes = bytes(full_plaintext)
+    result_bytes = b"".join(plaintext_blocks)
     result_b64 = base64.b64encode(result_bytes).decode("ascii")
     return {"plaintext": result_b64}
\ No newline at end of file
@@ -16,12 +16,15 @@ class Connection:
 
 # Exakte Anzahl erhalten für Fehlerbehebung
     def recv_exact(self, q_count):
-        data = bytearray()
-        while len(data) < q_count:
-            chunk = self.socket.recv(q_count - len(data))
-            if not chunk:
+        # direkt in einen vorab angelegten Puffer lesen, ohne Zwischenobjekte pro Chunk
+        data = bytearray(q_count)
+        view = memoryview(data)
+        received = 0
+        while received < q_count:
+            n = self.socket.recv_into(view[received:])
+            if not n:
                 raise ConnectionError("Connection closed before receiving bytes.")
-            data.extend(chunk)
+            received += n
         return bytes(data)
 
 # Key id rüberschicken 2 Bytes
@@ -42,6 +45,10 @@ class Connection:
     def send_q_blocks(self, q_block):
         self.socket.sendall(q_block)
 
+# Anzahl und Q Blöcke in einem einzigen sendall abschicken (ein Syscall/Segment statt zwei)
+    def send_batch(self, q_count, q_blocks):
+        self.socket.sendall(q_count.to_bytes(2, byteorder="little") + q_blocks)
+
 # Antwort erhalten
     def receive_response(self, q_count):
         return self.recv_exact(q_count)
@@ -1,19 +1,25 @@
-from gmpy2 import mpz, gcd, f_mod
+import os
+from concurrent.futures import ProcessPoolExecutor
+from gmpy2 import mpz, gcd, f_mod, square, divexact, next_prime, primorial, is_prime
 
-def parse_to_int(exponent):
-    """
-    Konvertiert einen Integer oder String in einen Integer.
-    """
-    if isinstance(exponent, int):
-        return exponent
-    if isinstance(exponent, str):
-        return int(exponent, 0)
+# maximale Anzahl Blätter pro Teilbaum im Remainder-Forest
+FOREST_CHUNK_SIZE = 512
+# verfügbare Kerne für die parallele Bearbeitung der Teilbäume
+FOREST_WORKERS = os.cpu_count() or 1
+# erst ab so vielen Blättern lohnt der Start eines Prozesspools; darunter kostet
+# das Starten der Prozesse mehr als die Teilbäume seriell zu bearbeiten
+FOREST_PARALLEL_MIN_LEAVES = 4096
+# Primzahlen unter dieser Grenze werden vorab per gcd mit dem Primorial abgespalten
+SMALL_PRIME_BOUND = 1 << 12
+SMALL_PRIMORIAL = primorial(SMALL_PRIME_BOUND)
+# Grenzen für die Ausgabe als 32-Bit-Integer
+INT32_MIN, INT32_MAX = -(1 << 31), (1 << 31) - 1
 
 def to_32bit_or_hex(x: int):
     """
     Gibt x zurück, wenn es in 32 Bit passt, sonst die Hex-Darstellung.
     """
-    if x in range(-(2 ** 31), 2 ** 31):
+    if INT32_MIN <= x <= INT32_MAX:
         return x
     return hex(x)
 
@@ -28,90 +34,267 @@ def build_product_tree(leaves):
     # baue Ebenen: paarweise Produkte, letzter einsam bleibt stehen
     while len(levels[-1]) > 1:
         cur = levels[-1]
-        nxt = []
-        for i in range(0, len(cur), 2):
-            if i + 1 < len(cur):
-                nxt.append(cur[i] * cur[i + 1])
-            else:
-                nxt.append(cur[i])
+        nxt = [a * b for a, b in zip(cur[::2], cur[1::2])]
+        if len(cur) & 1:
+            nxt.append(cur[-1])
         levels.append(nxt)
     return levels
 
-def compute_leaf_remainders_mod_n_sq(levels):
+def iter_leaf_remainders(levels):
     """
-    Top-down Reduktion: liefert z_i = P mod n_i^2 für jedes Blatt i.
+    Top-down Reduktion: liefert (i, z_i) mit z_i = P mod n_i^2 für jedes Blatt i,
+    sobald der letzte Abstiegsschritt für dieses Blatt erledigt ist.
     levels[0] sind die Blätter (n_i), levels[-1][0] ist das Wurzelprodukt P.
     """
     if not levels or not levels[0]:
-        return []
+        return
 
     # current enthält die Werte der Eltern auf der aktuellen Ebene (start: Wurzelprodukte)
     current = [val for val in levels[-1]]
+    if len(levels) == 1:
+        yield from enumerate(current)
+        return
 
-    # von oben nach unten: pro Knoten Rest modulo n_i^2 berechnen
-    for lvl in range(len(levels) - 2, -1, -1):
+    # von oben nach unten bis über die Blätter: pro Knoten Rest modulo Knoten^2 berechnen
+    for lvl in range(len(levels) - 2, 0, -1):
         parents = current
-        nodes = levels[lvl]  # Produkte auf dieser Ebene (bei lvl=0 sind das die n_i)
-        next_values = [mpz(0)] * len(nodes)
-        for idx, node_val in enumerate(nodes):
-            P = parents[idx // 2]           # Elternprodukt
-            n_square = node_val ** 2        # n_i^2
-            next_values[idx] = f_mod(P, n_square)  # z_i = P mod n_i^2
-        current = next_values
-    return current
+        current = [f_mod(parents[idx >> 1], square(node_val))
+                   for idx, node_val in enumerate(levels[lvl])]
+
+    # letzte Ebene: z_i = P mod n_i^2 direkt weitergeben statt zu sammeln
+    for idx, n_i in enumerate(levels[0]):
+        yield idx, f_mod(current[idx >> 1], square(n_i))
+
+def remainder_forest(moduli, chunk_size=FOREST_CHUNK_SIZE):
+    """
+    Remainder-Forest: teilt die moduli in Teilbäume mit höchstens chunk_size Blättern.
+    Liefert pro Teilbaum (start, chunk, P mod root_s^2), damit jeder Teilbaum
+    unabhängig von den anderen abgestiegen werden kann.
+    """
+    chunks = [moduli[i:i + chunk_size] for i in range(0, len(moduli), chunk_size)]
+
+    # obere Ebene: Wurzeln der Teilbäume und P mod root_s^2 für jeden Teilbaum
+    roots = [build_product_tree(chunk)[-1][0] for chunk in chunks]
+    root_remainders = [z for _, z in iter_leaf_remainders(build_product_tree(roots))]
+
+    return [(s * chunk_size, chunk, root_rem)
+            for s, (chunk, root_rem) in enumerate(zip(chunks, root_remainders))]
+
+def subtree_shared_factors(task):
+    """
+    Baut einen Teilbaum lokal neu auf, steigt ab P mod root_s^2 ab und liefert
+    (i, g) mit g = gcd(z_i / n_i, n_i) für alle Blätter mit g > 1.
+    """
+    start, chunk, root_rem = task
+    levels = build_product_tree(chunk)
+    levels[-1] = [root_rem]
+
+    found = []
+    for idx, z_i in iter_leaf_remainders(levels):
+        n_i = chunk[idx]
+        # z_i ist Vielfaches von n_i, der Quotient ist (P / n_i) mod n_i < n_i;
+        # ist er 0, teilt n_i das Restprodukt vollständig und gcd wäre n_i
+        quot = divexact(z_i, n_i)
+        g = gcd(quot, n_i) if quot else n_i
+        if g > 1:
+            found.append((start + idx, g))
+    return found
+
+def iter_forest_shared_factors(moduli):
+    """
+    Liefert (i, g) für alle moduli mit gemeinsamem Faktor g > 1. Die Teilbäume
+    werden nur bei mehreren Kernen und großen Eingaben auf Prozesse verteilt,
+    sonst seriell bearbeitet.
+    """
+    # nach Bitlänge sortieren, damit benachbarte Knoten etwa gleich groß sind;
+    # order bildet die sortierte Position zurück auf den ursprünglichen Index ab
+    order = sorted(range(len(moduli)), key=lambda i: moduli[i].bit_length())
+    tasks = remainder_forest([moduli[i] for i in order])
+    if FOREST_WORKERS > 1 and len(tasks) > 1 and len(moduli) >= FOREST_PARALLEL_MIN_LEAVES:
+        with ProcessPoolExecutor(max_workers=min(len(tasks), FOREST_WORKERS)) as executor:
+            for found in executor.map(subtree_shared_factors, tasks):
+                for i, g in found:
+                    yield order[i], g
+    else:
+        for task in tasks:
+            for i, g in subtree_shared_factors(task):
+                yield order[i], g
+
+def factor_pair(n_i, g):
+    """
+    Liefert (p, q) mit p <= q aus n_i und einem echten Teiler g.
+    """
+    q = divexact(n_i, g)
+    # Bitlängen entscheiden fast immer, nur bei gleicher Länge voll vergleichen
+    gb, qb = g.bit_length(), q.bit_length()
+    if gb > qb or (gb == qb and g > q):
+        g, q = q, g
+    return int(g), int(q)
+
+def split_in_tree(n, levels, own=None):
+    """
+    Sucht per Abstieg im Produktbaum einen echten Teiler von n, wenn die Wurzel n
+    vollständig enthält. own ist der Blattindex von n selbst, der herausgeteilt wird.
+    """
+    idx = 0
+    for lvl in range(len(levels) - 2, -1, -1):
+        nodes = levels[lvl]
+        for child in (2 * idx, 2 * idx + 1):
+            if child >= len(nodes):
+                continue
+            node_val = nodes[child]
+            if own is not None and own >> lvl == child:
+                node_val = divexact(node_val, n)
+            g = gcd(n, node_val)
+            if 1 < g < n:
+                return g
+            if g == n:
+                idx = child
+                break
+        else:
+            return None
+    return None
 
-def batch_gcd_shared_factors(moduli):
+def resolve_unresolved(unresolved, resolved):
+    """
+    Zweiter Durchlauf für moduli mit gcd == n_i: Batch-GCD nur über die
+    unaufgelösten moduli plus ein gcd gegen das Produkt der aufgelösten moduli.
+    Enthält eine Seite beide Primfaktoren, wird im jeweiligen Produktbaum abgestiegen.
+    Liefert (n_i, g) mit echtem Teiler g oder g = None.
+    """
+    u_levels = build_product_tree(unresolved)
+    r_levels = build_product_tree(resolved)
+    r_root = r_levels[-1][0] if r_levels else mpz(1)
+
+    for k, z_k in iter_leaf_remainders(u_levels):
+        n_k = unresolved[k]
+        g_u = gcd(divexact(z_k, n_k), n_k)
+        g_r = gcd(n_k, r_root)
+        if 1 < g_u < n_k:
+            yield n_k, g_u
+        elif 1 < g_r < n_k:
+            yield n_k, g_r
+        elif g_u == n_k:
+            yield n_k, split_in_tree(n_k, u_levels, own=k)
+        elif g_r == n_k:
+            yield n_k, split_in_tree(n_k, r_levels)
+
+def split_small_primes(n):
+    """
+    Zerlegt n in die Liste seiner kleinen Primfaktoren (< SMALL_PRIME_BOUND, mit
+    Vielfachheit) und den Rest ohne diese Faktoren. Ein gcd mit dem Primorial genügt,
+    um moduli ohne kleine Faktoren sofort zu erkennen.
+    """
+    s = gcd(n, SMALL_PRIMORIAL)
+    if s == 1 or n <= 0:
+        return [], n
+    small = []
+    p = mpz(2)
+    while s > 1:
+        if s % p == 0:
+            s = divexact(s, p)
+            while n % p == 0:
+                small.append(p)
+                n = divexact(n, p)
+                if n == 0:
+                    break
+        p = next_prime(p)
+    return small, n
+
+def batch_gcd_shared_factors(moduli, split_small=True):
     """
     Findet gemeinsame Primfaktoren per Batch-GCD mit Fallback bei Grenzfällen.
+    split_small=False schaltet den Vorab-Durchlauf für kleine Primfaktoren ab.
     """
-    if not moduli:
-        return []
+    # doppelte moduli nur einmal in den Baum aufnehmen: sie würden sich sonst
+    # gegenseitig vollständig teilen (gcd == n_i) und das Ergebnis wird ohnehin
+    # dedupliziert; rsa_factor liefert bereits mpz, reine ints funktionieren ebenso
+    mods_mpz = list(dict.fromkeys(moduli))
+    if 0 in mods_mpz:
+        raise ValueError("Modulus must not be zero")
 
-    mods_mpz = [mpz(x) for x in moduli]
-    levels = build_product_tree(mods_mpz)
-    z_i_list = compute_leaf_remainders_mod_n_sq(levels)
+    # ein modulus kann nichts teilen, zwei moduli brauchen nur einen gcd
+    if len(mods_mpz) < 2:
+        return []
+    if len(mods_mpz) == 2:
+        g = gcd(*mods_mpz)
+        return sorted({factor_pair(n_i, g) for n_i in mods_mpz if 1 < g < n_i})
 
-    result_pairs = []
+    result_pairs = set()
     unresolved_indices = []
 
+    # 0) kleine Primfaktoren vorab abspalten; solche moduli gehen nur mit ihrem
+    #    großen Rest in den Baum, geteilte kleine Primzahlen werden direkt gezählt
+    large_moduli = []
+    smooth = []
+    for n in mods_mpz:
+        small, rest = split_small_primes(n) if split_small else ([], n)
+        if not small:
+            large_moduli.append(n)
+        elif len(small) + (rest > 1) <= 2 and (rest == 1 or is_prime(rest)):
+            smooth.append((n, small, rest))
+        else:
+            # mehr als zwei Primfaktoren: ohne Vorab-Durchlauf rechnen, damit die
+            # Teiler wie im reinen Batch-GCD gewählt werden
+            large_moduli, smooth = mods_mpz, []
+            break
+
+    small_count = {}
+    rest_count = {}
+    for n, small, rest in smooth:
+        for p in set(small):
+            small_count[p] = small_count.get(p, 0) + 1
+        if rest > 1:
+            rest_count[rest] = rest_count.get(rest, 0) + 1
+    leaves = large_moduli + list(rest_count)
+    rest_hits = {}
+
     # 1) Normalfall, gcd liefert gemeinsamen Primfaktor
-    for i, (n_i, z_i) in enumerate(zip(mods_mpz, z_i_list)):
-        g = gcd(z_i // n_i, n_i)
-        if g > 1 and g < n_i:
-            p = int(g)
-            q = int(n_i // g)
-            if p > q:
-                p, q = q, p
-            result_pairs.append((p, q))
+    for i, g in iter_forest_shared_factors(leaves):
+        n_i = leaves[i]
+        if i >= len(large_moduli):
+            rest_hits[n_i] = g
+        elif g < n_i:
+            result_pairs.add(factor_pair(n_i, g))
         elif g == n_i:
             unresolved_indices.append(i)
 
-    # 2) Fallback: paarweise GCDs für nicht aufgelöste moduli
+    # moduli mit kleinen Faktoren: geteilt über eine kleine Primzahl oder den Rest
+    for n_i, small, rest in smooth:
+        g = next((p for p in small if small_count[p] > 1), None)
+        if g is None and rest > 1:
+            g = rest if rest_count[rest] > 1 else rest_hits.get(rest)
+        if g is not None and 1 < g < n_i:
+            result_pairs.add(factor_pair(n_i, g))
+
+    # 2) zweiter Batch-GCD für nicht aufgelöste moduli
+    if unresolved_indices and smooth:
+        # welcher Teiler beim Abstieg gefunden wird, hängt von der Baumform ab; bei
+        # moduli mit mehr als zwei Primfaktoren soll sie der ohne Vorab-Durchlauf gleichen
+        return batch_gcd_shared_factors(mods_mpz, split_small=False)
     if unresolved_indices:
-        for idx_i in unresolved_indices:
-            n_i = mods_mpz[idx_i]
-            for idx_j, n_j in enumerate(mods_mpz):
-                if idx_j == idx_i:
+        unresolved_set = set(unresolved_indices)
+        unresolved = [leaves[i] for i in unresolved_indices]
+        resolved = [n for i, n in enumerate(leaves) if i not in unresolved_set]
+        for n_i, g in resolve_unresolved(unresolved, resolved):
+            if g is None:
+                # Fallback: paarweise GCDs (nur bei mehr als zwei Primfaktoren nötig)
+                for n_j in mods_mpz:
+                    g = gcd(n_i, n_j)
+                    if g > 1 and g < n_i:
+                        break
+                else:
                     continue
-                g = gcd(n_i, n_j)
-                if g > 1 and g < n_i:
-                    p = int(g)
-                    q = int(n_i // g)
-                    if p > q:
-                        p, q = q, p
-                    result_pairs.append((p, q))
-                    break
+            result_pairs.add(factor_pair(n_i, g))
 
-    # Deduplizieren und sortieren
-    result_pairs = sorted(set(result_pairs), key=lambda t: (t[0], t[1]))
-    return result_pairs
+    # Tupel sortieren lexikographisch, Duplikate hat das Set bereits entfernt
+    return sorted(result_pairs)
 
 def rsa_factor(arguments):
     raw_moduli = arguments["moduli"]
 
-    moduli_parsed = []
-    for idx, m in enumerate(raw_moduli):
-        moduli_parsed.append(parse_to_int(m))
+    # Hex-Strings parst gmpy2 direkt in C, JSON-Integer werden direkt zu mpz
+    moduli_parsed = [mpz(m, 0) if isinstance(m, str) else mpz(m) for m in raw_moduli]
 
     # Faktorisieren
     pairs = batch_gcd_shared_factors(moduli_parsed)
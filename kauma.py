@@ -1,25 +1,140 @@
 #!/usr/bin/env python3
 
+import importlib
 import json
+import os
+import stat
 import sys
 
-from actions import calc
-from actions.padding_oracle import padding_oracle
-from actions import gf128
-from actions import aes_gcm
-from actions import gfpoly
-from actions import gcm_crack
-from actions import rsa_factor
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def dispatch_action(action, arguments, action_lut):
+# Ausgabe wird gesammelt und in Blöcken dieser Größe geschrieben
+OUTPUT_FLUSH_SIZE = 1 << 16
+
+def contains_float(obj) -> bool:
     """
-    Mapped die action auf die korrespondierende Funktion.
+    Prüft, ob irgendwo in der geparsten Struktur ein float steckt.
+    """
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            return True
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return False
+
+def load_json(file):
+    """
+    Parst die JSON-Datei mit orjson, falls verfügbar, sonst mit dem json-Modul.
+    Integer über 64 Bit lehnt orjson ab bzw. liefert sie je nach Version als float,
+    die Testfälle enthalten keine floats, daher wird in beiden Fällen mit json neu geparst.
+    """
+    raw = file.read()
+    if orjson is not None:
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            if not contains_float(data):
+                return data
+    return json.loads(raw)
+
+def dump_json(obj) -> bytes:
+    """
+    Serialisiert obj als einzeiliges JSON, mit orjson falls verfügbar.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj).encode()
+
+def stdout_is_pipe() -> bool:
+    """
+    Prüft, ob stdout eine Pipe ist (z.B. zu einem Bewerter statt in eine Datei).
+    """
+    try:
+        return stat.S_ISFIFO(os.fstat(sys.stdout.fileno()).st_mode)
+    except (OSError, ValueError):
+        return False
+
+def flush_replies(out: bytearray):
+    """
+    Schreibt den gesammelten Puffer nach stdout und leert ihn.
     """
-    mapped_action = action_lut.get(action)
+    sys.stdout.buffer.write(out)
+    sys.stdout.buffer.flush()
+    out.clear()
+
+def write_reply(out: bytearray, uuid, response):
+    """
+    Hängt die Antwortzeile an out an und schreibt den Puffer erst ab
+    OUTPUT_FLUSH_SIZE Bytes gesammelt nach stdout. An eine Pipe geht jede Zeile
+    sofort, damit Teilergebnisse auch bei einem Abbruch ankommen.
+    """
+    out += dump_json({"id": uuid, "reply": response})
+    out += b"\n"
+    if FLUSH_EACH_REPLY or len(out) >= OUTPUT_FLUSH_SIZE:
+        flush_replies(out)
+
+FLUSH_EACH_REPLY = stdout_is_pipe()
+
+# action -> (Modul, Funktion); Module werden erst beim ersten Aufruf importiert
+ACTION_LUT = {
+    "calc": ("actions.calc", "calc"),
+    "padding_oracle": ("actions.padding_oracle.padding_oracle", "start_attack"),
+    "gf_mul": ("actions.gf128", "gf_mul"),
+    "gf_divmod": ("actions.gf128", "gf_divmod"),
+    "gf_inv": ("actions.gf128", "gf_inv"),
+    "gf_div": ("actions.gf128", "gf_div"),
+    "gf_pow": ("actions.gf128", "gf_pow"),
+    "gf_sqrt": ("actions.gf128", "gf_sqrt"),
+    "gcm_encrypt": ("actions.aes_gcm", "gcm_encrypt"),
+    "gfpoly_sort": ("actions.gfpoly", "gfpoly_sort"),
+    "gfpoly_monic": ("actions.gfpoly", "gfpoly_monic"),
+    "gfpoly_add": ("actions.gfpoly", "gfpoly_add"),
+    "gfpoly_mul": ("actions.gfpoly", "gfpoly_mul"),
+    "gfpoly_divmod": ("actions.gfpoly", "gfpoly_divmod"),
+    "gfpoly_gcd": ("actions.gfpoly", "gfpoly_gcd"),
+    "gfpoly_pow": ("actions.gfpoly", "gfpoly_pow"),
+    "gfpoly_powmod": ("actions.gfpoly", "gfpoly_powmod"),
+    "gfpoly_diff": ("actions.gfpoly", "gfpoly_diff"),
+    "gfpoly_sqrt": ("actions.gfpoly", "gfpoly_sqrt"),
+    "gfpoly_factor_sff": ("actions.gfpoly", "gfpoly_factor_sff"),
+    "gfpoly_factor_ddf": ("actions.gfpoly", "gfpoly_factor_ddf"),
+    "gfpoly_factor_edf": ("actions.gfpoly", "gfpoly_factor_edf"),
+    "gcm_crack": ("actions.gcm_crack", "gcm_crack"),
+    "rsa_factor": ("actions.rsa_factor", "rsa_factor"),
+}
+resolved_actions = {}
+
+def resolve_action(action):
+    """
+    Importiert das Modul der action beim ersten Aufruf und merkt sich die Funktion.
+    """
+    mapped_action = resolved_actions.get(action)
     if mapped_action is None:
+        module_name, function_name = ACTION_LUT[action]
+        mapped_action = getattr(importlib.import_module(module_name), function_name)
+        resolved_actions[action] = mapped_action
+    return mapped_action
+
+def dispatch_action(action, arguments):
+    """
+    Mapped die action auf die korrespondierende Funktion.
+    """
+    if action not in ACTION_LUT:
         return {"error": "Unknown action"}
     try:
-        return mapped_action(arguments)
+        return resolve_action(action)(arguments)
     except Exception as e:
         return {"error": f"Action failed: {e}"}
 
@@ -29,41 +144,14 @@ def main():
     Liest eine JSON-Datei ein, interpretiert die action und die arguments
     und gibt als Ergebnis eine JSON im Einzeilenformat aus.
     """
-    action_lut = {
-        "calc": calc.calc,
-        "padding_oracle": padding_oracle.start_attack,
-        "gf_mul": gf128.gf_mul,
-        "gf_divmod": gf128.gf_divmod,
-        "gf_inv": gf128.gf_inv,
-        "gf_div": gf128.gf_div,
-        "gf_pow": gf128.gf_pow,
-        "gf_sqrt": gf128.gf_sqrt,
-        "gcm_encrypt": aes_gcm.gcm_encrypt,
-        "gfpoly_sort": gfpoly.gfpoly_sort,
-        "gfpoly_monic": gfpoly.gfpoly_monic,
-        "gfpoly_add": gfpoly.gfpoly_add,
-        "gfpoly_mul": gfpoly.gfpoly_mul,
-        "gfpoly_divmod": gfpoly.gfpoly_divmod,
-        "gfpoly_gcd": gfpoly.gfpoly_gcd,
-        "gfpoly_pow": gfpoly.gfpoly_pow,
-        "gfpoly_powmod": gfpoly.gfpoly_powmod,
-        "gfpoly_diff": gfpoly.gfpoly_diff,
-        "gfpoly_sqrt": gfpoly.gfpoly_sqrt,
-        "gfpoly_factor_sff": gfpoly.gfpoly_factor_sff,
-        "gfpoly_factor_ddf": gfpoly.gfpoly_factor_ddf,
-        "gfpoly_factor_edf": gfpoly.gfpoly_factor_edf,
-        "gcm_crack": gcm_crack.gcm_crack,
-        "rsa_factor": rsa_factor.rsa_factor,
-    }
-
     if len(sys.argv) != 2:
         print(f"Syntax: python3 {sys.argv[0]} <json_filename>", file=sys.stderr)
         sys.exit(1)
     json_testcase = sys.argv[1]
 
     try:
-        with open(json_testcase, 'r') as file:
-            data = json.load(file)
+        with open(json_testcase, 'rb') as file:
+            data = load_json(file)
     except FileNotFoundError:
         print(f"File {json_testcase} not found", file=sys.stderr)
         sys.exit(1)
@@ -71,20 +159,26 @@ def main():
         print(f"Invalid JSON: {e}", file=sys.stderr)
         sys.exit(1)
 
-    # Überprüfe, ob mehrere testcases vorhanden sind
-    if "testcases" in data:
-        testcases = data["testcases"]
-        for uuid, content in testcases.items():
-            action = content["action"]
-            arguments = content["arguments"]
-            response = dispatch_action(action, arguments, action_lut)
-            print(json.dumps({"id": uuid, "reply": response}))
-    else:
-        for uuid, content in data.items():
-            action = content["action"]
-            arguments = content["arguments"]
-            response = dispatch_action(action, arguments, action_lut)
-            print(json.dumps({"id": uuid, "reply": response}))
+    out = bytearray()
+
+    # bereits berechnete Antworten auch bei einer Exception noch ausgeben
+    try:
+        # Überprüfe, ob mehrere testcases vorhanden sind
+        if "testcases" in data:
+            testcases = data["testcases"]
+            for uuid, content in testcases.items():
+                action = content["action"]
+                arguments = content["arguments"]
+                response = dispatch_action(action, arguments)
+                write_reply(out, uuid, response)
+        else:
+            for uuid, content in data.items():
+                action = content["action"]
+                arguments = content["arguments"]
+                response = dispatch_action(action, arguments)
+                write_reply(out, uuid, response)
+    finally:
+        flush_replies(out)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,62 +1,20 @@
 import json
 import sys
 
-from actions import calc
-from actions.padding_oracle import padding_oracle
-from actions import gf128
-from actions import aes_gcm
-from actions import gfpoly
-from actions import gcm_crack
-from actions import rsa_factor
-
-def dispatch_action(action, arguments, action_lut):
-    mapped_action = action_lut.get(action)
-    if mapped_action is None:
-        return {"error": "Unknown action"}
-    try:
-        return mapped_action(arguments)
-    except Exception as e:
-        return {"error": f"Action failed: {e}"}
+from kauma import ACTION_LUT, dispatch_action, load_json, write_reply, flush_replies
 
 def compare_results(actual: dict, expected: dict) -> bool:
     return actual == expected
 
 def main():
-    action_lut = {
-        "calc": calc.calc,
-        "padding_oracle": padding_oracle.start_attack,
-        "gf_mul": gf128.gf_mul,
-        "gf_divmod": gf128.gf_divmod,
-        "gf_inv": gf128.gf_inv,
-        "gf_div": gf128.gf_div,
-        "gf_pow": gf128.gf_pow,
-        "gf_sqrt": gf128.gf_sqrt,
-        "gcm_encrypt": aes_gcm.gcm_encrypt,
-        "gfpoly_sort": gfpoly.gfpoly_sort,
-        "gfpoly_monic": gfpoly.gfpoly_monic,
-        "gfpoly_add": gfpoly.gfpoly_add,
-        "gfpoly_mul": gfpoly.gfpoly_mul,
-        "gfpoly_divmod": gfpoly.gfpoly_divmod,
-        "gfpoly_gcd": gfpoly.gfpoly_gcd,
-        "gfpoly_pow": gfpoly.gfpoly_pow,
-        "gfpoly_powmod": gfpoly.gfpoly_powmod,
-        "gfpoly_diff": gfpoly.gfpoly_diff,
-        "gfpoly_sqrt": gfpoly.gfpoly_sqrt,
-        "gfpoly_factor_sff": gfpoly.gfpoly_factor_sff,
-        "gfpoly_factor_ddf": gfpoly.gfpoly_factor_ddf,
-        "gfpoly_factor_edf": gfpoly.gfpoly_factor_edf,
-        "gcm_crack": gcm_crack.gcm_crack,
-        "rsa_factor": rsa_factor.rsa_factor,
-    }
-
     if len(sys.argv) != 2:
         print(f"Syntax: python3 {sys.argv[0]} <json_filename>", file=sys.stderr)
         sys.exit(1)
     json_testcase = sys.argv[1]
 
     try:
-        with open(json_testcase, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        with open(json_testcase, 'rb') as file:
+            data = load_json(file)
     except FileNotFoundError:
         print(f"File {json_testcase} not found", file=sys.stderr)
         sys.exit(1)
@@ -64,6 +22,7 @@ def main():
         print(f"Invalid JSON: {e}", file=sys.stderr)
         sys.exit(1)
 
+    out = bytearray()
     total = 0
     correct = 0
     incorrect = 0
@@ -79,14 +38,14 @@ def main():
         arguments = content.get("arguments", {})
 
         # Unbekannte Action
-        if action not in action_lut:
+        if action not in ACTION_LUT:
             missing_action.append(uuid)
             incorrect += 1
-            print(json.dumps({"id": uuid, "reply": {"error": "Unknown action"}}))
+            write_reply(out, uuid, {"error": "Unknown action"})
             return
 
-        response = dispatch_action(action, arguments, action_lut)
-        print(json.dumps({"id": uuid, "reply": response}))
+        response = dispatch_action(action, arguments)
+        write_reply(out, uuid, response)
 
         # Sofort vergleichen, wenn expectedResults vorhanden sind
         if expected_results is not None:
@@ -110,8 +69,12 @@ def main():
         testcases = data["testcases"]
         expected_results = data.get("expectedResults", None)
 
-        for uuid, content in testcases.items():
-            process_one(uuid, content, expected_results)
+        # bereits berechnete Antworten auch bei einer Exception noch ausgeben
+        try:
+            for uuid, content in testcases.items():
+                process_one(uuid, content, expected_results)
+        finally:
+            flush_replies(out)
 
         if expected_results is not None:
             summary = f"korrekt: {correct}/{total}, inkorrekt: {incorrect}/{total}"
@@ -125,8 +88,11 @@ def main():
                 ids = [m["id"] for m in mismatches]
                 print("Fehlgeschlagene Testcases (IDs): " + ", ".join(ids), file=sys.stderr)
     else:
-        for uuid, content in data.items():
-            process_one(uuid, content, None)
+        try:
+            for uuid, content in data.items():
+                process_one(uuid, content, None)
+        finally:
+            flush_replies(out)
 
 if __name__ == '__main__':
     main()